@@ -3,9 +3,9 @@ from widgets import RadioButton, Val
 CONFIG = {
     "FPS_CAP": 10,
     "GENERATOR": Val("random_dfs"),
-    "ALGOS": ["random_dfs", "prim"],
+    "ALGOS": ["random_dfs", "prim", "kruskal", "binary_tree", "sidewinder", "wilson"],
     "SOLVER": Val("breadth_first_search"),
-    "SOLVER_ALGOS": ["breadth_first_search", "depth_first_search", "a_star" ]
+    "SOLVER_ALGOS": ["breadth_first_search", "depth_first_search", "a_star", "bidirectional_bfs", "tree_path", "distance_map" ]
 }
 
 def curried_select(config_key:str, ):
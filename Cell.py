@@ -1,13 +1,26 @@
-from Direction import DIRECTIONS, Direction
+from Direction import DIRECTIONS, INVERSE, Direction
 from State import State
 import re
 
 class Cell:
+    __slots__ = ("X", "Y", "_walls", "_visited")
+
     def __init__(self, x:int, y:int ) -> None:
         self.X = x
         self.Y = y
         # For every direction, set the wall in that direction as unvisited
-        self.walls = {d:State.UNVISITED for d in DIRECTIONS}
+        self._walls = {d:State.UNVISITED for d in DIRECTIONS}
+        # Cached so that checking if a cell is part of the maze doesn't scan the walls
+        self._visited = False
+
+    @property
+    def walls(self) -> dict[Direction, State]:
+        return self._walls
+
+    @walls.setter
+    def walls(self, walls:dict[Direction, State]):
+        self._walls = walls
+        self._visited = State.VISITED in walls.values()
 
     def unvisited_walls(self):
         """Returns a list of directions that are unvisited"""
@@ -22,13 +35,18 @@ class Cell:
         return [d for d in self.walls if self.walls[d] != State.BLOCKED]
     @property
     def visited(self) -> bool:
-        return State.VISITED in self.walls.values()
+        return self._visited
 
     def visit(self, other: "Cell", d:Direction):
         # Remove the wall between the current cell and chosen cell... 
-        self.walls[d] = State.VISITED
+        self.open_wall(d)
         # and the chosen cell
-        other.walls[d.inverse()] = State.VISITED
+        other.open_wall(INVERSE[d])
+
+    def open_wall(self, d:Direction):
+        """Marks the wall in the given direction as visited. Use this instead of writing to `walls` so `visited` stays up to date"""
+        self._walls[d] = State.VISITED
+        self._visited = True
 
     @property
     def coordinate(self):
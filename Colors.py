@@ -2,3 +2,9 @@ class Colors:
     BLACK = (0, 0, 0)
     WHITE = (255, 255, 255)
     RED = (255,0,0)
+    GOLD = (255, 215, 0)
+    # The colors of the sprites, for drawing mazes a few pixels a cell
+    BOARDWALK = (152, 136, 113)
+    GRASS = (92, 102, 58)
+    FOOTPRINT = (57, 55, 67)
+    HIGHLIGHT = (153, 229, 80)
@@ -6,18 +6,11 @@ class Direction(Enum):
     EAST = (1,0)
     SOUTH = (0,1)
 
+    # Members are singletons, so the identity hash is enough. Enum's default hashes the name in Python code on every dict lookup
+    __hash__ = object.__hash__
+
     def inverse(self):
-        match self:
-            case Direction.WEST:
-                return Direction.EAST
-            case Direction.NORTH:
-                return Direction.SOUTH
-            case Direction.EAST:
-                return Direction.WEST
-            case Direction.SOUTH:
-                return Direction.NORTH
-            case _:
-                raise Exception("Invalid Direction")
+        return INVERSE[self]
 
     def __str__(self):
         return self.show()
@@ -35,3 +28,17 @@ class Direction(Enum):
                 raise Exception("Invalid Direction")
             
 DIRECTIONS = list(Direction)
+
+# Precomputed tables for the hot loops, so they don't have to go through the Enum machinery on every step
+DX = {d: d.value[0] for d in DIRECTIONS}
+DY = {d: d.value[1] for d in DIRECTIONS}
+INVERSE = {
+    Direction.WEST: Direction.EAST,
+    Direction.NORTH: Direction.SOUTH,
+    Direction.EAST: Direction.WEST,
+    Direction.SOUTH: Direction.NORTH,
+}
+# Maps a (dx,dy) offset to its Direction, replaces Direction((dx,dy))
+FROM_DELTA = {d.value: d for d in DIRECTIONS}
+# The position of every Direction in DIRECTIONS, used to pack a direction into 2 bits
+DIRECTION_INDEX = {d: i for i, d in enumerate(DIRECTIONS)}
@@ -0,0 +1,81 @@
+from array import array
+from collections import OrderedDict, deque
+from Cell import Cell
+from MazeIndex import MazeIndex
+
+class DistanceMap:
+    """The breadth first search distances and parents of every cell from a single start.
+
+    Once built, the path to any goal is found by following the parents back to the start,
+    so moving the goal doesn't need another search.
+
+    Attributes:
+    - index: The MazeIndex of the maze.
+    - start: The node the distances are measured from.
+    - distance: The number of steps from the start to every node, -1 if it can't be reached.
+    - parent: The node every node was reached from, -1 for the start and unreachable nodes.
+    - order: The reachable nodes in the order they were found, so by increasing distance.
+    """
+    def __init__(self, index:MazeIndex, start:int):
+        distance = array('i', [-1]) * len(index)
+        parent = array('i', [-1]) * len(index)
+        order = array('I', [start])
+        distance[start] = 0
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            next_distance = distance[node] + 1
+            for neighbor in index.neighbors(node):
+                if distance[neighbor] == -1:
+                    distance[neighbor] = next_distance
+                    parent[neighbor] = node
+                    order.append(neighbor)
+                    queue.append(neighbor)
+
+        self.index = index
+        self.start = start
+        self.distance = distance
+        self.parent = parent
+        self.order = order
+
+    def path_to(self, goal:int) -> list[int]:
+        """Returns the nodes from the start to goal, empty if goal can't be reached"""
+        if self.distance[goal] == -1:
+            return []
+        path = [goal]
+        while path[-1] != self.start:
+            path.append(self.parent[path[-1]])
+        path.reverse()
+        return path
+
+    def within(self, steps:int) -> list[int]:
+        """Returns the nodes that are at most the given number of steps away from the start"""
+        nodes = []
+        for node in self.order:
+            if self.distance[node] > steps:
+                break
+            nodes.append(node)
+        return nodes
+
+    def cell_path(self, goal:Cell) -> list[tuple[int,int]]:
+        """Returns the coordinates from the start to a goal cell"""
+        return [self.index.coordinate(node) for node in self.path_to(self.index.node(goal))]
+
+    def cells_within(self, steps:int) -> list[tuple[int,int]]:
+        """Returns the coordinates of the cells that are at most the given number of steps away from the start"""
+        return [self.index.coordinate(node) for node in self.within(steps)]
+
+# Distance maps by (maze fingerprint, start), least recently used first
+_cache: OrderedDict[tuple[str,int], DistanceMap] = OrderedDict()
+CACHE_SIZE = 8
+
+def distance_map(index:MazeIndex, start:Cell) -> DistanceMap:
+    """Returns the distance map of a start cell, reusing it if the same maze was already searched from there"""
+    key = (index.fingerprint, index.node(start))
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    _cache[key] = DistanceMap(index, key[1])
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return _cache[key]
@@ -1,14 +1,22 @@
 from Animator import animator
+from binary_tree import binary_tree
+from carve_events import new_events
 from CONFIG import CONFIG, curried_select
 from Cell import Cell
 from Colors import Colors
 from Fonts import Fonts
+from kruskal import kruskal
 from maze import make_initial_maze
+import maze_cache
 from prim import prim
 from random_dfs import random_dfs
-from render_maze import render_maze
+from render_maze import MazeLayer
+from Viewport import Viewport
+from sidewinder import sidewinder
+from wilson import wilson
 from widgets import BoolVal, Button, RadioButton, Text, TextField
 import pygame
+import random
 from typing import Callable
 
 class GeneratorScreen:
@@ -25,6 +33,7 @@ class GeneratorScreen:
         FPS_FIELD: TextField,
         FPS_LABEL: pygame.Surface,
         FPS_LABEL_RECT: pygame.Rect,
+        viewport: Viewport,
     ):
         self.SIZE = SIZE
         self.width = width
@@ -46,6 +55,22 @@ class GeneratorScreen:
         self.FPS_FIELD = FPS_FIELD
         self.FPS_LABEL = FPS_LABEL
         self.FPS_LABEL_RECT = FPS_LABEL_RECT
+        self.viewport = viewport
+        self.layer = MazeLayer(paths, viewport)
+        self.events = new_events()
+        # Every maze is made from a seed, so going back to one that was made before takes it from maze_cache
+        self.seed = random.getrandbits(31)
+        # The seed the maze on the screen was made from, None for a loaded maze
+        self.maze_seed:int|None = None
+        # The maze on the screen and where the building sprite was drawn, to know what to redraw in the next frame
+        self.shown_maze:list[list[Cell]]|None = None
+        self.builder_rect:pygame.Rect|None = None
+        # The areas of the screen with the UI, right of and below the maze
+        screen_width, screen_length = screen.get_size()
+        self.UI_RECTS = [
+            pygame.Rect(viewport.rect.right, 0, screen_width - viewport.rect.right, screen_length),
+            pygame.Rect(0, viewport.rect.bottom, viewport.rect.right, screen_length - viewport.rect.bottom),
+        ]
 
         self.RADIO_BUTTONS = [
             RadioButton(
@@ -61,6 +86,30 @@ class GeneratorScreen:
                 x = self.reposition_img(2.5, 8.3)[0], # type: ignore
                 y = self.reposition_img(2.5, 8.3)[1], # type: ignore
             ),
+            RadioButton(
+                text = 'Kruskal',
+                assigned = 'kruskal',
+                x = self.reposition_img(3.5, 8.3)[0], # type: ignore
+                y = self.reposition_img(3.5, 8.3)[1], # type: ignore
+            ),
+            RadioButton(
+                text = 'Binary Tree',
+                assigned = 'binary_tree',
+                x = self.reposition_img(0.5, 8.65)[0], # type: ignore
+                y = self.reposition_img(0.5, 8.65)[1], # type: ignore
+            ),
+            RadioButton(
+                text = 'Sidewinder',
+                assigned = 'sidewinder',
+                x = self.reposition_img(2.5, 8.65)[0], # type: ignore
+                y = self.reposition_img(2.5, 8.65)[1], # type: ignore
+            ),
+            RadioButton(
+                text = 'Wilson',
+                assigned = 'wilson',
+                x = self.reposition_img(4.2, 8.65)[0], # type: ignore
+                y = self.reposition_img(4.2, 8.65)[1], # type: ignore
+            ),
         ]
 
         self.set_algo = curried_select("GENERATOR")(self.RADIO_BUTTONS)
@@ -113,7 +162,7 @@ class GeneratorScreen:
             ),
         )
         self.RESTART_BUTTON = Button(
-        onclick= self.start,
+        onclick= self.restart,
         text=Text(
             'delete',
             screen,
@@ -129,19 +178,56 @@ class GeneratorScreen:
     def start(self, _=None):
         self._running = True
         self.generated = False
-        if CONFIG["GENERATOR"].value == "random_dfs":
-            self.start_cell, self.ending_cell, self.gen,self.maze,self.traversal = random_dfs(length=self.length,width=self.width)
+        self.events = new_events()
+        self.maze_seed = self.seed
+        algorithm = CONFIG["GENERATOR"].value
+        if maze_cache.is_cached(algorithm, self.length, self.width, self.seed):
+            # Made before with this generator and seed, show it finished instead of making it again
+            self.start_cell, self.ending_cell, self.maze = maze_cache.generate_maze(algorithm, self.length, self.width, self.seed)
+            self.layer.attach(self.maze, self.events)
+            self.gen = None
+            self.finish()
+            return
+        rng = random.Random(self.seed)
+        if algorithm == "random_dfs":
+            self.start_cell, self.ending_cell, self.gen,self.maze,self.traversal = random_dfs(length=self.length,width=self.width, events=self.events, rng=rng)
 
-        elif CONFIG["GENERATOR"].value == "prim":
+        elif algorithm == "prim":
             self.maze = make_initial_maze(length=self.length,width=self.width)
-            self.start_cell, self.ending_cell, self.gen,self.maze,self.traversal = prim(self.maze)
+            self.start_cell, self.ending_cell, self.gen,self.maze,self.traversal = prim(self.maze, events=self.events, rng=rng)
+
+        elif algorithm == "kruskal":
+            self.start_cell, self.ending_cell, self.gen,self.maze,self.traversal = kruskal(length=self.length,width=self.width, events=self.events, rng=rng)
+
+        elif algorithm == "binary_tree":
+            self.start_cell, self.ending_cell, self.gen,self.maze,self.traversal = binary_tree(length=self.length,width=self.width, events=self.events, rng=rng)
+
+        elif algorithm == "sidewinder":
+            self.start_cell, self.ending_cell, self.gen,self.maze,self.traversal = sidewinder(length=self.length,width=self.width, events=self.events, rng=rng)
+
+        elif algorithm == "wilson":
+            self.start_cell, self.ending_cell, self.gen,self.maze,self.traversal = wilson(length=self.length,width=self.width, events=self.events, rng=rng)
+
+        self.layer.attach(self.maze, self.events)
 
         self.PLAYING.to_false()
+    def restart(self):
+        """Starts over on a new maze"""
+        self.seed = random.getrandbits(31)
+        self.start()
     def skip(self):
-        while self.gen != None:
-            self.step()
+        """Shows the finished maze at once, without drawing the steps in between.
+        It is the maze the animation would end on, made by the generator's fast path or taken from the cache."""
+        if self.gen != None:
+            self.start_cell, self.ending_cell, self.maze = maze_cache.generate_maze(CONFIG["GENERATOR"].value, self.length, self.width, self.seed)
+            # Already cached, there is nothing for finish to remember
+            self.gen = None
+            self.finish()
 
     def loop(self):
+        # Another screen drew over this one, so the first frame draws all of it
+        self.shown_maze = None
+        self.builder_rect = None
         while self._running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
@@ -160,6 +246,7 @@ class GeneratorScreen:
                     button.listen(event)
                 self.save_button.listen(event)
                 self.load_button.listen(event)
+                self.viewport.listen(event)
 
                 # toggle playing on spacebar
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
@@ -167,18 +254,34 @@ class GeneratorScreen:
                         self.end()
                     else:
                         self.PLAYING.toggle()
-            # Draw the game screen
-            self.screen.fill((0, 0, 0))
-            # Draw the maze
-            render_maze(
-                self.maze,
-                self.width,
-                self.length,
-                self.screen,
-                self.paths,
-                self.reposition_img,
-                self.render_builder_sprite
-            )
+            # Draw the maze, only redrawing the cells carved since the last frame
+            self.viewport.scroll()
+            if self.layer.maze is not self.maze:
+                # A maze that wasn't generated here, like a loaded one
+                self.layer.attach(self.maze)
+            dirty = self.layer.update()
+            if self.shown_maze is not self.maze:
+                self.shown_maze = self.maze
+                dirty = [self.viewport.rect.copy()]
+            for rect in dirty:
+                self.layer.restore(self.screen, rect)
+            # Cover the building sprite of the last frame, and draw it where it is now
+            if self.builder_rect is not None:
+                self.layer.restore(self.screen, self.builder_rect)
+                dirty.append(self.builder_rect)
+                self.builder_rect = None
+            if self.traversal:
+                cell = self.traversal[-1]
+                rect = self.viewport.tile_rect(cell.X, cell.Y).clip(self.viewport.rect)
+                if rect:
+                    self.screen.set_clip(rect)
+                    self.screen.blit(self.viewport.scaled(next(self.BUILDING_SPRITE)), self.viewport.to_screen(cell.X, cell.Y))
+                    self.screen.set_clip(None)
+                    self.builder_rect = rect
+                    dirty.append(rect)
+            for rect in self.UI_RECTS:
+                self.screen.fill(Colors.BLACK, rect)
+                dirty.append(rect)
             # show the UI for generating
             if self.PLAYING:
                 self.PAUSE_BUTTON.draw()
@@ -195,8 +298,8 @@ class GeneratorScreen:
             # Paint the radio buttons
             for button in self.RADIO_BUTTONS:
                 button.draw(self.screen)
-            # Update the display
-            pygame.display.flip()
+            # Update the parts of the display that changed
+            pygame.display.update(dirty)
             # limit FPS
             pygame.time.Clock().tick(CONFIG['FPS_CAP'])
 
@@ -207,20 +310,15 @@ class GeneratorScreen:
         if self.gen != None:
             try:
                 next(self.gen)
-            except:
-                self.PLAYING.to_false()
-                self.traversal = []
-                self.gen = None
-                self.generated = True
+            except StopIteration:
+                self.finish()
         else:
             self.generated = True
 
-
-    def render_builder_sprite(
-            self,
-            cell:Cell,
-            position: tuple[int,int]
-        ):
-        if self.traversal and cell == self.traversal[-1]:
-            # draw the building sprite
-            self.screen.blit(next(self.BUILDING_SPRITE),position)
+    def finish(self):
+        self.PLAYING.to_false()
+        if self.gen != None:
+            maze_cache.remember_maze(CONFIG["GENERATOR"].value, self.length, self.width, self.seed, self.start_cell, self.ending_cell, self.maze)
+        self.traversal = []
+        self.gen = None
+        self.generated = True
@@ -0,0 +1,231 @@
+from array import array
+from collections.abc import Mapping
+from Direction import DIRECTIONS, DX, DY, INVERSE, Direction
+from State import State
+
+# Every cell is a single byte. Bit i is set when the wall towards DIRECTIONS[i] (W, N, E, S) has been carved.
+WALL_BITS = {d: 1 << i for i, d in enumerate(DIRECTIONS)}
+
+class MazeGrid:
+    """A maze stored as a flat buffer of one byte per cell, in row-major order.
+
+    Only the carved walls are stored; the blocked walls along the border are implied by the dimensions.
+    Indexing a grid like a matrix (`grid[y][x]`) returns a lightweight view that behaves like a `Cell`,
+    so the generators, solvers and renderers that work on `list[list[Cell]]` also work on a grid.
+
+    Attributes:
+    - length: The number of rows in the maze.
+    - width: The number of columns in the maze.
+    - cells: The buffer holding the carved walls of every cell.
+    - version: Counts the carves, code that writes to `cells` directly bumps it as well.
+    - index: The MazeIndex of the grid and the version it was built at, see `MazeIndex.index_of`.
+    """
+    __slots__ = ("length", "width", "cells", "version", "index")
+
+    def __init__(self, length:int, width:int, cells=None):
+        self.length = length
+        self.width = width
+        self.cells = bytearray(length * width) if cells is None else cells
+        if len(self.cells) != length * width:
+            raise ValueError(f"Expected a buffer of {length * width} cells, got {len(self.cells)}")
+        self.version = 0
+        self.index = None
+
+    @classmethod
+    def from_matrix(cls, maze) -> "MazeGrid":
+        """Packs the carved walls of a matrix of Cells into a new grid"""
+        cells = bytearray()
+        for row in maze:
+            for cell in row:
+                cells.append(sum(WALL_BITS[d] for d in cell.visited_walls()))
+        return cls(len(maze), len(maze[0]), cells)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, y:int) -> "GridRow":
+        if not 0 <= y < self.length:
+            raise IndexError(f"Row {y} is outside of the maze")
+        return GridRow(self, y)
+
+    def __iter__(self):
+        for y in range(self.length):
+            yield GridRow(self, y)
+
+    def border_mask(self, x:int, y:int) -> int:
+        """Returns the bits of the walls of a cell that face outside of the maze"""
+        mask = 0
+        if x == 0:
+            mask |= WALL_BITS[Direction.WEST]
+        if x == self.width - 1:
+            mask |= WALL_BITS[Direction.EAST]
+        if y == 0:
+            mask |= WALL_BITS[Direction.NORTH]
+        if y == self.length - 1:
+            mask |= WALL_BITS[Direction.SOUTH]
+        return mask
+
+    def passages(self, x:int, y:int) -> int:
+        """Returns the bits of the carved walls of a cell"""
+        return self.cells[y * self.width + x]
+
+    def is_visited(self, x:int, y:int) -> bool:
+        return self.cells[y * self.width + x] != 0
+
+    def carve(self, x:int, y:int, d:Direction):
+        """Removes the wall between a cell and its neighbor in the given direction"""
+        self.cells[y * self.width + x] |= WALL_BITS[d]
+        self.cells[(y + DY[d]) * self.width + x + DX[d]] |= WALL_BITS[INVERSE[d]]
+        self.version += 1
+
+    def __repr__(self) -> str:
+        return f"MazeGrid({self.width}x{self.length})"
+
+class GridRow:
+    """A row of a `MazeGrid`, indexed by x"""
+    __slots__ = ("grid", "y")
+
+    def __init__(self, grid:MazeGrid, y:int):
+        self.grid = grid
+        self.y = y
+
+    def __len__(self):
+        return self.grid.width
+
+    def __getitem__(self, x:int) -> "GridCell":
+        if not 0 <= x < self.grid.width:
+            raise IndexError(f"Column {x} is outside of the maze")
+        return GridCell(self.grid, x, self.y)
+
+    def __iter__(self):
+        for x in range(self.grid.width):
+            yield GridCell(self.grid, x, self.y)
+
+class GridTraversal:
+    """The cells a generator visited on a `MazeGrid`, kept as node ids (`y * width + x`) in an array of 4 bytes each.
+    Reads like a list of `GridCell`s, which are only made for the cells that are looked at."""
+    __slots__ = ("grid", "nodes")
+
+    def __init__(self, grid:MazeGrid, nodes:array):
+        self.grid = grid
+        self.nodes = nodes
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __getitem__(self, i:int) -> "GridCell":
+        node = self.nodes[i]
+        return GridCell(self.grid, node % self.grid.width, node // self.grid.width)
+
+    def __iter__(self):
+        width = self.grid.width
+        for node in self.nodes:
+            yield GridCell(self.grid, node % width, node // width)
+
+    def append(self, node:int):
+        self.nodes.append(node)
+
+class GridCell:
+    """A view of a single cell of a `MazeGrid` with the same interface as `Cell`.
+
+    Views are created on demand, so two views are equal when they point to the same cell of the same grid.
+    """
+    __slots__ = ("grid", "X", "Y")
+
+    def __init__(self, grid:MazeGrid, x:int, y:int):
+        self.grid = grid
+        self.X = x
+        self.Y = y
+
+    @property
+    def walls(self) -> "GridWalls":
+        return GridWalls(self)
+
+    @walls.setter
+    def walls(self, walls:dict[Direction, State]):
+        view = GridWalls(self)
+        for d, state in walls.items():
+            view[d] = state
+
+    @property
+    def visited(self) -> bool:
+        return self.grid.is_visited(self.X, self.Y)
+
+    def unvisited_walls(self):
+        """Returns a list of directions that are unvisited"""
+        closed = ~(self.grid.passages(self.X, self.Y) | self.grid.border_mask(self.X, self.Y))
+        return [d for d in DIRECTIONS if closed & WALL_BITS[d]]
+
+    def visited_walls(self):
+        """Returns a list of directions that are visited"""
+        carved = self.grid.passages(self.X, self.Y)
+        return [d for d in DIRECTIONS if carved & WALL_BITS[d]]
+
+    def non_blocked_walls(self):
+        border = self.grid.border_mask(self.X, self.Y)
+        return [d for d in DIRECTIONS if not border & WALL_BITS[d]]
+
+    def visit(self, other:"GridCell", d:Direction):
+        # Both sides of the wall live in the grid, so a single carve removes it from both cells
+        self.grid.carve(self.X, self.Y, d)
+
+    def open_wall(self, d:Direction):
+        """Marks the wall in the given direction as visited, on this side of the wall only"""
+        self.grid.cells[self.Y * self.grid.width + self.X] |= WALL_BITS[d]
+        self.grid.version += 1
+
+    @property
+    def coordinate(self):
+        return (self.X, self.Y)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, GridCell) and other.grid is self.grid and other.X == self.X and other.Y == self.Y
+
+    def __hash__(self) -> int:
+        return hash((self.X, self.Y))
+
+    def __repr__(self) -> str:
+        return f'({self.X},{self.Y})'
+
+    def __str__(self) -> str:
+        return self.__repr__()
+
+    # For excluvise use in A*, same as Cell
+    def __lt__(self, other):
+        return False
+    def __le__(self, other):
+        return False
+
+class GridWalls(Mapping):
+    """The `walls` dictionary of a `GridCell`, backed by the bits of the grid"""
+    __slots__ = ("cell",)
+
+    def __init__(self, cell:GridCell):
+        self.cell = cell
+
+    def __getitem__(self, d:Direction) -> State:
+        bit = WALL_BITS[d]
+        grid = self.cell.grid
+        if grid.passages(self.cell.X, self.cell.Y) & bit:
+            return State.VISITED
+        if grid.border_mask(self.cell.X, self.cell.Y) & bit:
+            return State.BLOCKED
+        return State.UNVISITED
+
+    def __setitem__(self, d:Direction, state:State):
+        grid = self.cell.grid
+        bit = WALL_BITS[d]
+        index = self.cell.Y * grid.width + self.cell.X
+        if state == State.VISITED:
+            grid.cells[index] |= bit
+        elif state == State.UNVISITED:
+            grid.cells[index] &= ~bit
+        elif not grid.border_mask(self.cell.X, self.cell.Y) & bit:
+            raise ValueError(f"Only the walls along the border of a MazeGrid can be blocked, got {d} of {self.cell}")
+        grid.version += 1
+
+    def __iter__(self):
+        return iter(DIRECTIONS)
+
+    def __len__(self):
+        return len(DIRECTIONS)
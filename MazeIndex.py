@@ -0,0 +1,102 @@
+from array import array
+from collections import OrderedDict
+from hashlib import blake2b
+from Cell import Cell
+from Direction import DIRECTIONS, DX, DY
+from MazeGrid import WALL_BITS, MazeGrid
+
+class MazeIndex:
+    """An immutable adjacency list of a maze over integer node ids, for the solvers.
+
+    The node of the cell at (x,y) is `y * width + x`. The neighbors are stored CSR-style:
+    the neighbors of node n are `targets[offsets[n]:offsets[n+1]]`, in the order of DIRECTIONS,
+    the same order `Cell.visited_walls()` returns them in.
+
+    Attributes:
+    - width, length: The dimensions of the maze.
+    - offsets: Where the neighbors of each node start in `targets`, has len(index) + 1 entries.
+    - targets: The neighbors of every node, one after the other.
+    - xs, ys: The coordinates of every node.
+    - source: The maze the index was built from, used to map nodes back to cells.
+    - fingerprint: A digest of the dimensions and passages, equal for indexes of identical mazes.
+    """
+    __slots__ = ("width", "length", "offsets", "targets", "xs", "ys", "source", "fingerprint")
+
+    def __init__(self, maze:list[list[Cell]]):
+        length = len(maze)
+        width = len(maze[0])
+        offsets = array('I', [0])
+        targets = array('I')
+        if isinstance(maze, MazeGrid):
+            # Read the wall bits directly instead of going through the cell views
+            steps = [(WALL_BITS[d], DY[d] * width + DX[d]) for d in DIRECTIONS]
+            for node, bits in enumerate(maze.cells):
+                for bit, step in steps:
+                    if bits & bit:
+                        targets.append(node + step)
+                offsets.append(len(targets))
+        else:
+            for y, row in enumerate(maze):
+                for x, cell in enumerate(row):
+                    for d in cell.visited_walls():
+                        targets.append((y + DY[d]) * width + x + DX[d])
+                    offsets.append(len(targets))
+
+        self.width = width
+        self.length = length
+        self.offsets = memoryview(offsets).toreadonly()
+        self.targets = memoryview(targets).toreadonly()
+        self.xs = memoryview(array('I', range(width)) * length).toreadonly()
+        self.ys = memoryview(array('I', [y for y in range(length) for _ in range(width)])).toreadonly()
+        self.source = maze
+        digest = blake2b(f"{width}x{length}".encode(), digest_size=16)
+        digest.update(offsets)
+        digest.update(targets)
+        self.fingerprint = digest.hexdigest()
+
+    @classmethod
+    def from_edgelist(cls, edgelist:dict[Cell, list[Cell]]) -> "MazeIndex":
+        from maze import as_matrix
+        return cls(as_matrix(edgelist))
+
+    def __len__(self):
+        return self.width * self.length
+
+    def node(self, cell:Cell) -> int:
+        """Returns the node id of a cell"""
+        return cell.Y * self.width + cell.X
+
+    def coordinate(self, node:int) -> tuple[int,int]:
+        return (self.xs[node], self.ys[node])
+
+    def cell(self, node:int) -> Cell:
+        """Returns the cell of the source maze for a node id"""
+        return self.source[self.ys[node]][self.xs[node]]
+
+    def neighbors(self, node:int):
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def edge_count(self) -> int:
+        """Returns the number of passages in the maze"""
+        return len(self.targets) // 2
+
+# The indexes of the most recently solved matrices of Cells by their identity. Lists can't hold attributes like a
+# MazeGrid does, and an index holds on to its maze, so the identity isn't reused while it's cached
+_cache: OrderedDict[int, MazeIndex] = OrderedDict()
+CACHE_SIZE = 4
+
+def index_of(maze:list[list[Cell]]) -> MazeIndex:
+    """Returns the index of a maze, only building it when the maze wasn't indexed yet.
+    A MazeGrid keeps its index and builds it again once it was carved since, a matrix of Cells must not be carved
+    any further once it has been indexed."""
+    if isinstance(maze, MazeGrid):
+        if maze.index is None or maze.index[0] != maze.version:
+            maze.index = (maze.version, MazeIndex(maze))
+        return maze.index[1]
+    index = _cache.get(id(maze))
+    if index is None or index.source is not maze:
+        index = _cache[id(maze)] = MazeIndex(maze)
+    _cache.move_to_end(id(maze))
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return index
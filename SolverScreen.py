@@ -3,22 +3,75 @@ from Animator import animator, load_image
 from CONFIG import CONFIG, curried_select
 from Cell import Cell
 from Colors import Colors
-from Direction import Direction
+from Direction import DIRECTIONS, DX, DY, FROM_DELTA, Direction
 from Fonts import Fonts
 from State import State
 from a_star import a_star_search
+from bidirectional_bfs import bidirectional_bfs
 from breadth_first_search import breadth_first_search
 from depth_first_search import depth_first_search
-from maze import matrix_to_edgelist
-from render_maze import render_maze, tile_position
+from DistanceMap import distance_map
+from MazeIndex import MazeIndex, index_of
+from TreePathIndex import tree_index_of
+from render_maze import PIXEL_TILE, MarkedCells, MazeLayer, tile_position
+from Viewport import Viewport
 from widgets import BoolVal, Button, RadioButton, Text, TextField, Val
+import numpy as np
 import pygame
 
+# The longest walk a search animates. The walk between the cells a search expands can be far longer than the maze
+# is big, on large mazes the player walks the path instead
+WALK_LIMIT = 200_000
+
+def solve(solver:str, index:MazeIndex, start:Cell, end:Cell) -> tuple[list[tuple[int,int]], list[tuple[int,int]]]:
+    """Returns the path from start to end as coordinates, and the walk of the player: the traversal of the search,
+    or the path itself for the solvers that don't search or when the traversal is longer than WALK_LIMIT."""
+    if solver == "depth_first_search":
+        path, traversal = depth_first_search(index, start, end, walk_limit=WALK_LIMIT)
+    elif solver == "a_star":
+        found, traversal = a_star_search({"start": start, "end": end, "graph": index}, walk_limit=WALK_LIMIT)
+        path = [] if found == None else [cell.coordinate for cell in found]
+    elif solver == "breadth_first_search":
+        found, traversal = breadth_first_search(index, start, end, walk_limit=WALK_LIMIT)
+        path = [cell.coordinate for cell in found]
+    elif solver == "bidirectional_bfs":
+        found, traversal = bidirectional_bfs(index, start, end, walk_limit=WALK_LIMIT)
+        path = [cell.coordinate for cell in found]
+    elif solver == "tree_path":
+        # Perfect mazes have a single path between two cells, look it up instead of searching
+        try:
+            path = tree_index_of(index).cell_path(start, end)
+        except ValueError:
+            # Not a perfect maze, so there is no single path to look up
+            path = distance_map(index, start).cell_path(end)
+        traversal = []
+    elif solver == "distance_map":
+        # Searched once per start, goal edits only backtrack the cached parents
+        path = distance_map(index, start).cell_path(end)
+        traversal = []
+    else:
+        raise ValueError(f"Unknown algorithm: {solver}")
+    if not traversal or len(traversal) >= WALK_LIMIT:
+        # There was no search, or its walk was cut short, so the player walks the path itself
+        traversal = list(path)
+    return path, traversal
+
 def calc_direction(
     MAZE: list[list[Cell]],
     to:tuple[int,int], 
-    traversal_order: list[tuple[int,int]]
+    traversal_order: list[tuple[int,int]],
+    first_visits: dict[tuple[int,int], int]|None = None,
 ):
+    if first_visits is not None:
+        # The same answer from the position of every coordinate in traversal_order, without going through all of it:
+        # the neighbour that came first, out of those with a passage to the target
+        first = None
+        for d in DIRECTIONS:
+            neighbour = (to[0] - DX[d], to[1] - DY[d])
+            index = first_visits.get(neighbour)
+            if index is not None and (first is None or index < first[0]) and MAZE[neighbour[1]][neighbour[0]].walls[d] == State.VISITED:
+                first = (index, d)
+        return None if first is None else first[1]
     # Check the maze for t
     TARGET = MAZE[to[1]][to[0]]
     for coord in traversal_order:
@@ -27,17 +80,47 @@ def calc_direction(
         dy = TARGET.coordinate[1] - cell.coordinate[1]
         if abs(dx) == abs(dy) or abs(dx) > 1 or abs(dy) > 1:
             continue
-        dir = Direction((dx,dy))
+        dir = FROM_DELTA[(dx,dy)]
         if cell.walls[dir] == State.VISITED:
             return dir
     return None
 
+class ScaledSprites:
+    """A set of sprites, scaled to the tile size of a viewport. Every size is kept, zooming back and forth reuses them"""
+    def __init__(self, sprites:dict[Direction, pygame.Surface]):
+        self.sprites = sprites
+        self.scaled:dict[int, dict[Direction, pygame.Surface]] = {}
+
+    def at(self, viewport:Viewport) -> dict[Direction, pygame.Surface]:
+        if viewport.tile not in self.scaled:
+            self.scaled[viewport.tile] = {d: viewport.scaled(sprite) for d, sprite in self.sprites.items()}
+        return self.scaled[viewport.tile]
+
+def render_visible(
+    screen:pygame.Surface,
+    viewport:Viewport,
+    directions:dict[tuple[int,int], list[Direction]],
+    sprites:dict[Direction, pygame.Surface],
+    pad:tuple[int,int],
+):
+    """Draws the sprite of every direction of the coordinates in the view, going through whichever is shorter:
+    the coordinates, or the cells in the view"""
+    columns, rows = viewport.visible()
+    if len(directions) > len(columns) * len(rows):
+        visible = [(x, y) for y in rows for x in columns if (x, y) in directions]
+    else:
+        visible = [coord for coord in directions if coord[0] in columns and coord[1] in rows]
+    screen.blits([
+        (sprites[d], viewport.to_screen(x, y, pad[0], pad[1]))
+        for (x, y) in visible
+        for d in directions[(x, y)]
+    ], doreturn=False)
+
 class HighlightedPathRender:
     def __init__(
             self, 
             SIZE:int,
             PATH_PAD:tuple[int,int],
-            reposition_img:Callable[[int,int, int,int],tuple[int,int]],
         ):
         self.SIZE = SIZE
         self.highlighted_path_sprites = {
@@ -46,22 +129,35 @@ class HighlightedPathRender:
             Direction.NORTH: load_image("assets/footPathHiglight/N.png", SIZE, SIZE),
             Direction.SOUTH: load_image("assets/footPathHiglight/S.png", SIZE, SIZE),
         }
-        self.directions:list[tuple[tuple[int,int], Direction]] = []
+        self.sprites = ScaledSprites(self.highlighted_path_sprites)
+        self.directions:dict[tuple[int,int], list[Direction]] = {}
+        # The cells of the path, for drawing it a pixel block a cell
+        self.marks = MarkedCells(Colors.HIGHLIGHT)
         self.PATH_PAD_X = PATH_PAD[0]
         self.PATH_PAD_Y = PATH_PAD[1]
-        self.reposition_img = reposition_img
  
-    def render(self, screen:pygame.Surface):
-        for highlighted_coord,dir in self.directions:
-            screen.blit(self.highlighted_path_sprites[dir], highlighted_coord)
+    def render(self, screen:pygame.Surface, viewport:Viewport):
+        if viewport.tile < PIXEL_TILE:
+            self.marks.render(screen, viewport)
+            return
+        render_visible(screen, viewport, self.directions, self.sprites.at(viewport), (self.PATH_PAD_X, self.PATH_PAD_Y))
     def calculate(
         self, 
         path:list[tuple[int,int]],
         maze: list[list[Cell]],
         ):
-        self.directions = [( # type: ignore
-            self.reposition_img(*path[i], self.PATH_PAD_X, self.PATH_PAD_Y), calc_direction(maze,path[i], path)) for i in range(len(path))
-        ]
+        first_visits = {}
+        for i, coord in enumerate(path):
+            first_visits.setdefault(coord, i)
+        self.directions = {}
+        cells = np.zeros((len(maze), len(maze[0])), dtype=bool)
+        for coord in path:
+            cells[coord[1], coord[0]] = True
+            d = calc_direction(maze, coord, path, first_visits)
+            if d is not None:
+                self.directions.setdefault(coord, []).append(d)
+        # The path doesn't change until the next solve, its pixels are only painted again when the view moves
+        self.marks.reset(cells)
 
 class PlayerRenderer:
     def __init__(
@@ -69,38 +165,38 @@ class PlayerRenderer:
             SIZE:int,
             PLAYER_X_PAD:int,
             PLAYER_Y_PAD:int,
-            reposition_img:Callable[[int,int, int,int],tuple[int,int]],
         ):
         self.SIZE = SIZE
         self.X_PAD = PLAYER_X_PAD
         self.Y_PAD = PLAYER_Y_PAD
         self.sprite = animator("assets/ekko/idle/ekkoidle", "png", 8, (SIZE))
         self.coord: Val[tuple[int,int]] = Val((-1,-1))
-        self.scaled_coord = (-1,-1)
-        self.coord.observers.append(self.scale)
-        self.reposition_img = reposition_img
         self.left_pressed = False
         self.right_pressed = False
         self.up_pressed = False
         self.down_pressed = False
 
-    def scale(self, coord:tuple[int,int]):
-        self.scaled_coord = self.reposition_img(coord[0], coord[1], self.X_PAD,self.Y_PAD)
-    def render(self, screen:pygame.Surface):
-        screen.blit(next(self.sprite), self.scaled_coord)
+    def render(self, screen:pygame.Surface, viewport:Viewport):
+        screen.blit(viewport.scaled(next(self.sprite)), viewport.to_screen(*self.coord.value, self.X_PAD, self.Y_PAD))
 class TrailRenderer:
     def __init__(
             self,
             MAZE: list[list[Cell]],
             SIZE:int, 
-            reposition_img:Callable[[int|float,int|float, int,int],tuple[int,int]],
             TRAIL_PAD :tuple[int,int]
     ):
         self.SIZE = SIZE
         self.MAZE = MAZE
-        self.reposition_img = reposition_img
-        self.visited_coords: list[tuple[tuple[int,int], Direction]] = []
+        # The directions the trail entered every coordinate from, looked up by coordinate to only draw the visible ones
+        self.visited_coords: dict[tuple[int,int], list[Direction]] = {}
+        # The same cells, for drawing the trail a pixel block a cell
+        self.visited_cells = MarkedCells(Colors.FOOTPRINT)
+        self.visited_cells.reset(np.zeros((len(MAZE), len(MAZE[0])), dtype=bool))
         self.traversal_order: list[tuple[int,int]] = []
+        # The position of every coordinate in traversal_order, see `first_visits`
+        self._first_visits: dict[tuple[int,int], int] = {}
+        self._indexed_order: list[tuple[int,int]] = self.traversal_order
+        self._indexed_length = 0
         self.TRAIL_X_PAD = TRAIL_PAD[0]
         self.TRAIL_Y_PAD = TRAIL_PAD[1]
 
@@ -116,23 +212,42 @@ class TrailRenderer:
             Direction.NORTH: load_image("assets/footPathHiglight/N.png", SIZE,SIZE),
             Direction.SOUTH: load_image("assets/footPathHiglight/S.png", SIZE,SIZE),
         }
+        self.sprites = ScaledSprites(self.trail_sprites)
+
+    def first_visits(self) -> dict[tuple[int,int], int]:
+        """Returns where every coordinate first is in traversal_order, only indexing what was added since the last call"""
+        if self._indexed_order is not self.traversal_order or len(self.traversal_order) < self._indexed_length:
+            self._first_visits = {}
+            self._indexed_order = self.traversal_order
+            self._indexed_length = 0
+        for i in range(self._indexed_length, len(self.traversal_order)):
+            self._first_visits.setdefault(self.traversal_order[i], i)
+        self._indexed_length = len(self.traversal_order)
+        return self._first_visits
 
     def add_visited_coords(self,coord:tuple[int,int]):
         d = calc_direction(
             MAZE=self.MAZE,
             to=coord,
-            traversal_order=self.traversal_order
+            traversal_order=self.traversal_order,
+            first_visits=self.first_visits(),
         )
         if d == None:
             return
 
-        self.visited_coords.append((self.reposition(coord), d))
+        self.visited_coords.setdefault(coord, []).append(d)
+        self.visited_cells.mark(*coord)
+
+    def clear(self):
+        """Removes the whole trail, sized for the current MAZE"""
+        self.visited_coords = {}
+        self.visited_cells.reset(np.zeros((len(self.MAZE), len(self.MAZE[0])), dtype=bool))
 
-    def render(self, screen:pygame.Surface):
-        for trail_coord, dir in self.visited_coords:
-            screen.blit(self.trail_sprites[dir], trail_coord)
-    def reposition(self, coord: tuple[int,int]):
-        return self.reposition_img(coord[0], coord[1], self.TRAIL_X_PAD, self.TRAIL_Y_PAD)
+    def render(self, screen:pygame.Surface, viewport:Viewport):
+        if viewport.tile < PIXEL_TILE:
+            self.visited_cells.render(screen, viewport)
+            return
+        render_visible(screen, viewport, self.visited_coords, self.sprites.at(viewport), (self.TRAIL_X_PAD, self.TRAIL_Y_PAD))
     def skip(self):
         for coord in self.traversal_order:
             self.add_visited_coords(coord)
@@ -196,15 +311,18 @@ class SolverScreen:
         FPS_FIELD: TextField,
         FPS_LABEL: pygame.Surface,
         FPS_LABEL_RECT: pygame.Rect,
+        viewport: Viewport,
     ):
         self.SIZE = SIZE
         self.width = width
         self.length = length
         self.screen = screen
         self.paths = paths
+        self.viewport = viewport
         self.path = []
         self.reposition_img = tile_position(SIZE)
         self.MAZE:list[list[Cell]] = maze
+        self.layer = MazeLayer(paths, viewport)
         self.start_cell:Cell = None # type: ignore
         self.ending_cell:Cell = None # type: ignore
         self.PLAYING = BoolVal(False)
@@ -213,7 +331,9 @@ class SolverScreen:
         self._running = True
         self.index = 0
         self.GOAL = animator("assets/goal/goal", "gif", 4, (SIZE-45))
-        self.PLAYER = PlayerRenderer(SIZE-30, 14, 3, self.reposition_img)
+        self.PLAYER = PlayerRenderer(SIZE-30, 14, 3)
+        # Keep the player in the view as it moves
+        self.PLAYER.coord.observers.append(lambda coord: self.viewport.show(*coord))
         self.GOAL_X_PAD = 23
         self.GOAL_Y_PAD = 8
         self.RADIO_BUTTONS = [
@@ -235,7 +355,25 @@ class SolverScreen:
                 text = 'Depth First Search',
                 x = self.reposition_img(4, 7)[0],
                 y = self.reposition_img(0.5, 8.3)[1],
-            )
+            ),
+            RadioButton(
+                assigned = 'bidirectional_bfs',
+                text = 'Bidirectional BFS',
+                x = self.reposition_img(0.5, 7)[0],
+                y = self.reposition_img(0.5, 8.65)[1],
+            ),
+            RadioButton(
+                assigned = 'tree_path',
+                text = 'Tree Path',
+                x = self.reposition_img(2.7, 7)[0],
+                y = self.reposition_img(0.5, 8.65)[1],
+            ),
+            RadioButton(
+                assigned = 'distance_map',
+                text = 'Distance Map',
+                x = self.reposition_img(4, 7)[0],
+                y = self.reposition_img(0.5, 8.65)[1],
+            ),
         ]
 
         self.set_algo = curried_select("SOLVER")(self.RADIO_BUTTONS)
@@ -320,19 +458,15 @@ class SolverScreen:
         }
         self.solved = False
         self.flag_sprite = animator("assets/flag/flag", "png", 7, (SIZE-45))
-        self.flagPosition = (-1,-1)
-        self.goalPosition = (-1,-1)
         self.trailRenderer = TrailRenderer(
             self.MAZE,
             self.SIZE-40,
-            self.reposition_img,
             (self.PLAYER.X_PAD+8, self.PLAYER.Y_PAD + 15)
         )
         self.PLAYER.coord.observers.append(self.trailRenderer.add_visited_coords)
         self.pathRenderer = HighlightedPathRender(
             self.SIZE-40,
-            (self.PLAYER.X_PAD+8, self.PLAYER.Y_PAD + 15),
-            self.reposition_img) # type: ignore
+            (self.PLAYER.X_PAD+8, self.PLAYER.Y_PAD + 15))
 
         self.NEXT_STEP = Button(
             onclick= self.step,
@@ -414,6 +548,12 @@ class SolverScreen:
             ))
     def search(self, maze:list[list[Cell]], start_cell:Cell, ending_cell:Cell):
         self.MAZE = maze
+        # A loaded maze can have any size, check the coordinates against the one being solved
+        self.START_CELL_FIELD.MAZE = maze
+        self.ENDING_CELL_FIELD.MAZE = maze
+        # Show it before the player moves to the start, so the view follows the player over the new maze
+        if self.layer.maze is not maze:
+            self.layer.attach(maze)
         self.start_cell = start_cell
         self.ending_cell = ending_cell
         # self.PLAYER.coord.set(self.start_cell.coordinate)
@@ -424,32 +564,18 @@ class SolverScreen:
         print("solving")
         self.solved = False
         self.trailRenderer.MAZE = self.MAZE
+        # Start the trail over before the player moves, so moving to the start isn't added to the last one
+        self.trailRenderer.traversal_order = []
+        self.trailRenderer.clear()
         self.PLAYER.coord.set(self.start_cell.coordinate)
-        self.trailRenderer.visited_coords = []
         self.index = 0
         # Update the field coordinates
         self.START_CELL_FIELD.tupleField.update(self.start_cell.coordinate.__repr__())
         self.ENDING_CELL_FIELD.tupleField.update(self.ending_cell.coordinate.__repr__())
-        if CONFIG["SOLVER"].value == "depth_first_search":
-            self.path, self.trailRenderer.traversal_order = depth_first_search(self.MAZE, self.start_cell, self.ending_cell)
-
-        elif CONFIG["SOLVER"].value == "a_star":
-            path, self.trailRenderer.traversal_order = a_star_search({
-            "start": self.start_cell,
-            "end": self.ending_cell,
-            "graph": matrix_to_edgelist(self.MAZE),
-            })
-            self.path = [] if path == None else [cell.coordinate for cell in path]
-        elif CONFIG["SOLVER"].value == "breadth_first_search":
-            path, self.trailRenderer.traversal_order = breadth_first_search(matrix_to_edgelist(self.MAZE), self.start_cell, self.ending_cell)
-            self.path = [] if path == None else [cell.coordinate for cell in path]
-        else:
-            raise ValueError(f"Unknown algorithm: {CONFIG['SOLVER']}")
-
-        # Note: The main loop can be optimized by pre-calculating the tile positions
+        # Built once per maze, solver switches, restarts and start/goal edits reuse it
+        index = index_of(self.MAZE)
+        self.path, self.trailRenderer.traversal_order = solve(CONFIG["SOLVER"].value, index, self.start_cell, self.ending_cell)
         self.pathRenderer.calculate(self.path, self.MAZE)
-        self.goalPosition = self.reposition_img(self.ending_cell.X, self.ending_cell.Y, self.GOAL_X_PAD, self.GOAL_Y_PAD)
-        self.flagPosition = self.reposition_img(self.start_cell.X, self.start_cell.Y, self.GOAL_X_PAD, self.GOAL_Y_PAD)
 
     def loop(self):
         while self._running:
@@ -475,6 +601,7 @@ class SolverScreen:
                     button.listen(event)
                 self.save_button.listen(event)
                 self.load_button.listen(event)
+                self.viewport.listen(event)
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_w:
                         self.PLAYER.up_pressed = True
@@ -501,19 +628,15 @@ class SolverScreen:
                     else:
                         self.start_or_continue()
             self.player_movement(int(self.PLAYER.right_pressed) - int(self.PLAYER.left_pressed),int(self.PLAYER.down_pressed) - int(self.PLAYER.up_pressed))
+            self.viewport.scroll()
 
             # Draw the game screen
             self.screen.fill((0, 0, 0))
-            # Draw the maze
-            render_maze(
-                self.MAZE,
-                self.width,
-                self.length,
-                self.screen,
-                self.paths,
-                self.reposition_img,
-                lambda cell, position: None
-            )
+            # Draw the maze, its tiles are only drawn again when it's replaced or the view moves
+            if self.layer.maze is not self.MAZE:
+                self.layer.attach(self.MAZE)
+            self.layer.update()
+            self.layer.restore(self.screen, self.viewport.rect)
             # show the UI for generating
             if self.PLAYING:
                 self.PAUSE_BUTTON.draw()
@@ -543,26 +666,36 @@ class SolverScreen:
             for button in self.RADIO_BUTTONS:
                 button.draw(self.screen)
 
+            # Everything else on the maze is cut off at the edges of the view
+            self.screen.set_clip(self.viewport.rect)
             # Draw the trail:
-            self.trailRenderer.render(self.screen)
+            self.trailRenderer.render(self.screen, self.viewport)
             # Draw the highlighted path
             if self.solved:
-                self.pathRenderer.render(self.screen)
-
-            #Draw the flag
-            self.screen.blit(next(self.flag_sprite), self.flagPosition)
-
-            # Draw the player
-            self.PLAYER.render(self.screen)
-            # Draw a red outline
-            outline_x,outline_y = self.reposition_img(self.PLAYER.coord.value[0], self.PLAYER.coord.value[1])
-            pygame.draw.rect(self.screen, Colors.RED,(outline_x,outline_y,self.SIZE,self.SIZE ), 6)
-            # Draw a red outline around the tile the player is in
-            # Draw the goal
-            self.screen.blit(
-                next(self.GOAL),
-                self.goalPosition
-            )
+                self.pathRenderer.render(self.screen, self.viewport)
+
+            if self.viewport.tile < PIXEL_TILE:
+                # The sprites would be a few pixels, mark the start, goal and player with squares that can be seen
+                pygame.draw.rect(self.screen, Colors.WHITE, self.marker_rect(self.start_cell.coordinate, 5))
+                pygame.draw.rect(self.screen, Colors.GOLD, self.marker_rect(self.ending_cell.coordinate, 5))
+                pygame.draw.rect(self.screen, Colors.RED, self.marker_rect(self.PLAYER.coord.value, 9), 2)
+            else:
+                #Draw the flag
+                self.screen.blit(
+                    self.viewport.scaled(next(self.flag_sprite)),
+                    self.viewport.to_screen(self.start_cell.X, self.start_cell.Y, self.GOAL_X_PAD, self.GOAL_Y_PAD)
+                )
+
+                # Draw the player
+                self.PLAYER.render(self.screen, self.viewport)
+                # Draw a red outline around the tile the player is in
+                pygame.draw.rect(self.screen, Colors.RED, self.viewport.tile_rect(*self.PLAYER.coord.value), max(1, round(6 * self.viewport.scale)))
+                # Draw the goal
+                self.screen.blit(
+                    self.viewport.scaled(next(self.GOAL)),
+                    self.viewport.to_screen(self.ending_cell.X, self.ending_cell.Y, self.GOAL_X_PAD, self.GOAL_Y_PAD)
+                )
+            self.screen.set_clip(None)
 
             # Update the display
             pygame.display.flip()
@@ -571,6 +704,10 @@ class SolverScreen:
 
             if self.PLAYING:
                 self.step()
+    def marker_rect(self, coord:tuple[int,int], size:int) -> pygame.Rect:
+        """Returns the rect of a cell, grown around its center to at least `size` pixels"""
+        rect = self.viewport.tile_rect(*coord)
+        return rect.inflate(max(0, size - rect.width), max(0, size - rect.height))
     def step(self):
         """Returns if the generator is done"""
         if self.trailRenderer.traversal_order and self.index < len(self.trailRenderer.traversal_order):
@@ -17,5 +17,8 @@ class State(Enum):
     VISITED = 1
     BLOCKED = 2
 
+    # Members are singletons, so the identity hash is enough
+    __hash__ = object.__hash__
+
     def __str__(self):
         return self.name
@@ -0,0 +1,72 @@
+from array import array
+from MazeIndex import MazeIndex
+
+class TraversalBuilder:
+    """Builds the walking animation of a search: the cell-to-cell walk from each expanded node to the next one.
+
+    Every discovered node records its parent and depth in the search tree. Walking from the previously expanded
+    node to the next one climbs from both of them to their lowest common ancestor, so each walk costs O(path length)
+    instead of a search over the whole maze. In a perfect maze the search tree is the maze itself, so the walk is
+    the same one a depth first search between the two nodes would take.
+
+    Attributes:
+    - parent: The parent of every discovered node in the search tree, -1 for the root and undiscovered nodes.
+    - depth: The depth of every discovered node in the search tree.
+    - traversal: The coordinates walked so far.
+    - limit: The most coordinates the walk is kept to, it is cut short there. There is no limit when it is None.
+    - truncated: If the walk was cut short.
+    """
+    def __init__(self, index:MazeIndex, root:int, limit:int|None=None):
+        self.index = index
+        self.parent = array('i', [-1]) * len(index)
+        self.depth = array('I', [0]) * len(index)
+        self.traversal: list[tuple[int,int]] = []
+        self.marker = root
+        self.limit = limit
+        self.truncated = False
+
+    def discover(self, node:int, parent:int):
+        """Records that node was reached from parent"""
+        self.parent[node] = parent
+        self.depth[node] = self.depth[parent] + 1
+
+    def walk_to(self, node:int):
+        """Appends the walk from the last expanded node to node, excluding node itself, as it is where the next walk starts"""
+        if self.truncated:
+            return
+        parent = self.parent
+        depth = self.depth
+        a, b = self.marker, node
+        # Nodes from the marker up to the common ancestor, and from node up to (excluding) the common ancestor
+        up:list[int] = []
+        down:list[int] = []
+        while depth[a] > depth[b]:
+            up.append(a)
+            a = parent[a]
+        while depth[b] > depth[a]:
+            down.append(b)
+            b = parent[b]
+        while a != b:
+            up.append(a)
+            a = parent[a]
+            down.append(b)
+            b = parent[b]
+        if down:
+            up.append(a)
+            # down[0] is node itself
+            up.extend(reversed(down[1:]))
+
+        coordinate = self.index.coordinate
+        self.traversal.extend([coordinate(n) for n in up])
+        self.marker = node
+        if self.limit is not None and len(self.traversal) > self.limit:
+            del self.traversal[self.limit:]
+            self.truncated = True
+
+    def path_to(self, node:int) -> list[int]:
+        """Returns the nodes from the root to node"""
+        path = [node]
+        while self.parent[path[-1]] != -1:
+            path.append(self.parent[path[-1]])
+        path.reverse()
+        return path
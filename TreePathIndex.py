@@ -0,0 +1,140 @@
+from array import array
+from Cell import Cell
+from MazeIndex import MazeIndex
+from maze import as_matrix, import_maze_details
+
+class TreePathIndex:
+    """Answers distance and path queries between any two cells of a perfect maze without searching.
+
+    A perfect maze (like the ones random_dfs and prim make) is a spanning tree, so the path between two cells is unique
+    and goes through their lowest common ancestor. The tree is rooted at node 0 and walked once to record an Euler tour;
+    a sparse table over the tour then finds the lowest common ancestor of any two nodes in O(1).
+    Building takes O(n log n) time and memory.
+
+    Attributes:
+    - index: The MazeIndex of the maze.
+    - parent: The parent of every node, -1 for the root.
+    - depth: The number of steps from the root to every node.
+    """
+    def __init__(self, index:MazeIndex):
+        n = len(index)
+        if index.edge_count() != n - 1:
+            raise ValueError(f"Not a perfect maze: {index.edge_count()} passages between {n} cells")
+        offsets, targets = index.offsets, index.targets
+        parent = array('i', [-1]) * n
+        depth = array('I', [0]) * n
+        first = array('I', [0]) * n
+        euler = array('I')
+        seen = bytearray(n)
+        seen[0] = 1
+        # The next edge to follow for every node on the stack, so the tour doesn't need recursion
+        next_edge = array('I', offsets[:n])
+        stack = [0]
+        euler.append(0)
+        while stack:
+            node = stack[-1]
+            edge = next_edge[node]
+            if edge == offsets[node + 1]:
+                stack.pop()
+                if stack:
+                    euler.append(stack[-1])
+                continue
+            next_edge[node] = edge + 1
+            child = targets[edge]
+            if child == parent[node]:
+                continue
+            if seen[child]:
+                raise ValueError("Not a perfect maze: it has a loop")
+            seen[child] = 1
+            parent[child] = node
+            depth[child] = depth[node] + 1
+            first[child] = len(euler)
+            euler.append(child)
+            stack.append(child)
+        if len(euler) != 2 * n - 1:
+            raise ValueError("Not a perfect maze: some cells can't be reached")
+
+        # table[k][i] is the shallowest node of euler[i:i + 2**k]
+        table = [euler]
+        span = 1
+        while span * 2 <= len(euler):
+            previous = table[-1]
+            table.append(array('I', [
+                a if depth[a] <= depth[b] else b
+                for a, b in zip(previous, previous[span:])
+            ]))
+            span *= 2
+
+        self.index = index
+        self.parent = parent
+        self.depth = depth
+        self.first = first
+        self.table = table
+
+    def lca(self, a:int, b:int) -> int:
+        """Returns the lowest common ancestor of two nodes"""
+        left, right = self.first[a], self.first[b]
+        if left > right:
+            left, right = right, left
+        level = (right - left + 1).bit_length() - 1
+        row = self.table[level]
+        x, y = row[left], row[right - (1 << level) + 1]
+        return x if self.depth[x] <= self.depth[y] else y
+
+    def distance(self, a:int, b:int) -> int:
+        """Returns the number of steps between two nodes"""
+        return self.depth[a] + self.depth[b] - 2 * self.depth[self.lca(a, b)]
+
+    def distances(self, pairs:list[tuple[int,int]]) -> list[int]:
+        """Answers a batch of distance queries"""
+        return [self.distance(a, b) for a, b in pairs]
+
+    def path(self, a:int, b:int) -> list[int]:
+        """Returns the nodes on the path from a to b, in O(path length)"""
+        ancestor = self.lca(a, b)
+        up = [a]
+        while up[-1] != ancestor:
+            up.append(self.parent[up[-1]])
+        down = [b]
+        while down[-1] != ancestor:
+            down.append(self.parent[down[-1]])
+        down.pop()
+        down.reverse()
+        return up + down
+
+    def cell_path(self, start:Cell, end:Cell) -> list[tuple[int,int]]:
+        """Returns the coordinates on the path between two cells"""
+        return [self.index.coordinate(node) for node in self.path(self.index.node(start), self.index.node(end))]
+
+# The tree of the most recently indexed maze, so start/goal edits reuse it
+_cached_tree: TreePathIndex | None = None
+
+def tree_index_of(index:MazeIndex) -> TreePathIndex:
+    """Returns the TreePathIndex of a MazeIndex, only building it when the index differs from the last one"""
+    global _cached_tree
+    if _cached_tree is None or _cached_tree.index is not index:
+        _cached_tree = TreePathIndex(index)
+    return _cached_tree
+
+def parse_cli_args() :
+    import argparse
+    from sys import argv
+    parser = argparse.ArgumentParser(description='Finds the path between the start and end of a perfect maze using its tree')
+    parser.add_argument('-f', '--file', type=str, required=True, help='reads a json file containing a maze')
+    if len(argv) == 1:
+        parser.print_help()
+        exit(0)
+    return parser.parse_args(argv[1:])
+
+def main():
+    '''Run if main module'''
+    args = parse_cli_args()
+    if args.file:
+        maze_info = import_maze_details(args.file)
+        tree = TreePathIndex(MazeIndex(as_matrix(maze_info['graph'])))
+        path = tree.cell_path(maze_info['start'], maze_info['end'])
+        print(" -> ".join([str(coord) for coord in path]))
+        print("Distance:", len(path) - 1)
+
+if __name__ == '__main__':
+    main()
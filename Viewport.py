@@ -0,0 +1,146 @@
+import math
+import pygame
+
+class Viewport:
+    """The camera over the maze: which part of it is shown in an area of the screen, and how big its tiles are drawn.
+
+    Positions in the maze are in cells, positions in the view are in screen pixels. The sprites are made for tiles
+    of SIZE pixels, anything drawn for a tile of another size is scaled by `scale`. Zoomed out past a pixel a cell,
+    the tile is 1/n of a pixel and every pixel shows n by n cells.
+
+    Attributes:
+    - rect: The area of the screen the maze is drawn in.
+    - tile: The size of a tile on the screen, one of ZOOM_LEVELS.
+    - x, y: The pixel of the whole maze, at the current tile size, shown in the top left corner of `rect`.
+    """
+    # The most cells a pixel shows when zoomed all the way out
+    MAX_CELLS_PER_PIXEL = 16
+    # How far the arrow keys scroll in a frame, in screen pixels
+    PAN_SPEED = 20
+
+    def __init__(self, SIZE:int, rect:pygame.Rect):
+        self.SIZE = SIZE
+        self.rect = rect
+        # Every zoom step makes the tiles a fifth smaller, they are whole pixels or whole fractions of one
+        levels:list[int|float] = []
+        tile = float(SIZE)
+        while tile * self.MAX_CELLS_PER_PIXEL >= 1:
+            level = round(tile) if tile >= 1 else 1 / round(1 / tile)
+            if level not in levels:
+                levels.append(level)
+            tile *= 0.8
+        self.ZOOM_LEVELS = levels
+        self.width = 0
+        self.length = 0
+        self.tile:int|float = SIZE
+        self.x = 0
+        self.y = 0
+        self.dragging = False
+
+    @property
+    def scale(self) -> float:
+        return self.tile / self.SIZE
+
+    @property
+    def state(self) -> tuple[int|float, int, int, int, int]:
+        """Changes whenever something else of the maze is shown"""
+        return (self.tile, self.x, self.y, self.width, self.length)
+
+    def set_maze(self, width:int, length:int):
+        """Shows a maze of another size, zoomed out so as much of it as possible is seen from its top left corner"""
+        self.width = width
+        self.length = length
+        self.tile = self.min_tile()
+        self.x = self.y = 0
+
+    def min_tile(self) -> int|float:
+        """Returns the smallest tile the view zooms out to: the first where the whole maze fits, or the smallest level"""
+        for tile in self.ZOOM_LEVELS:
+            if tile * self.width <= self.rect.width and tile * self.length <= self.rect.height:
+                return tile
+        return self.ZOOM_LEVELS[-1]
+
+    def clamp(self):
+        """Keeps the view over the maze"""
+        self.x = max(0, min(self.x, math.ceil(self.width * self.tile) - self.rect.width))
+        self.y = max(0, min(self.y, math.ceil(self.length * self.tile) - self.rect.height))
+
+    def pan(self, dx:int, dy:int):
+        self.x += dx
+        self.y += dy
+        self.clamp()
+
+    def zoom(self, steps:int, anchor:tuple[int,int]|None=None):
+        """Zooms in by a number of ZOOM_LEVELS, out when negative, keeping the point of the maze under `anchor` in place"""
+        levels = [tile for tile in self.ZOOM_LEVELS if tile >= self.min_tile()]
+        current = min(range(len(levels)), key=lambda i: abs(levels[i] - self.tile))
+        tile = levels[max(0, min(current - steps, len(levels) - 1))]
+        if tile == self.tile:
+            return
+        ax, ay = (anchor[0] - self.rect.x, anchor[1] - self.rect.y) if anchor is not None else (self.rect.width // 2, self.rect.height // 2)
+        self.x = round((self.x + ax) * tile / self.tile) - ax
+        self.y = round((self.y + ay) * tile / self.tile) - ay
+        self.tile = tile
+        self.clamp()
+
+    def show(self, x:int, y:int):
+        """Scrolls as little as possible so a cell is in the view"""
+        left, top = math.floor(x * self.tile), math.floor(y * self.tile)
+        size = math.ceil(self.tile)
+        if left < self.x:
+            self.x = left
+        elif left + size > self.x + self.rect.width:
+            self.x = left + size - self.rect.width
+        if top < self.y:
+            self.y = top
+        elif top + size > self.y + self.rect.height:
+            self.y = top + size - self.rect.height
+        self.clamp()
+
+    def visible(self) -> tuple[range, range]:
+        """Returns the columns and rows of the cells in the view, even when only part of them is"""
+        columns = range(math.floor(self.x / self.tile), min(self.width, math.ceil((self.x + self.rect.width) / self.tile)))
+        rows = range(math.floor(self.y / self.tile), min(self.length, math.ceil((self.y + self.rect.height) / self.tile)))
+        return columns, rows
+
+    def to_screen(self, x:int|float, y:int|float, x_pad:int=0, y_pad:int=0) -> tuple[int, int]:
+        """Works like `tile_position`, for the current zoom and scroll. The pads are given for tiles of SIZE"""
+        scale = self.scale
+        return (
+            self.rect.x + math.floor(x * self.tile) - self.x + round(x_pad * scale),
+            self.rect.y + math.floor(y * self.tile) - self.y + round(y_pad * scale),
+        )
+
+    def tile_rect(self, x:int, y:int) -> pygame.Rect:
+        """Returns the rect of a cell on the screen, a pixel at least"""
+        size = max(1, round(self.tile))
+        return pygame.Rect(self.to_screen(x, y), (size, size))
+
+    def scaled(self, surface:pygame.Surface) -> pygame.Surface:
+        """Returns a sprite made for tiles of SIZE scaled to the current tile"""
+        if self.tile == self.SIZE:
+            return surface
+        width, height = surface.get_size()
+        return pygame.transform.scale(surface, (max(1, round(width * self.scale)), max(1, round(height * self.scale))))
+
+    def listen(self, event:pygame.event.Event):
+        """Zooms with the mouse wheel, scrolls by dragging with the right or middle mouse button, Home zooms out"""
+        if event.type == pygame.MOUSEWHEEL and self.rect.collidepoint(pygame.mouse.get_pos()):
+            self.zoom(event.y, pygame.mouse.get_pos())
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (2, 3) and self.rect.collidepoint(event.pos):
+            self.dragging = True
+        elif event.type == pygame.MOUSEBUTTONUP and event.button in (2, 3):
+            self.dragging = False
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            self.pan(-event.rel[0], -event.rel[1])
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_HOME:
+            self.tile = self.min_tile()
+            self.x = self.y = 0
+
+    def scroll(self):
+        """Scrolls while the arrow keys are held down, called once a frame"""
+        keys = pygame.key.get_pressed()
+        dx = keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]
+        dy = keys[pygame.K_DOWN] - keys[pygame.K_UP]
+        if dx or dy:
+            self.pan(dx * self.PAN_SPEED, dy * self.PAN_SPEED)
@@ -1,58 +1,91 @@
-from queue import PriorityQueue
+from array import array
+from heapq import heappop, heappush
+from typing import Callable
 from Cell import Cell
-from depth_first_search import depth_first_search
-from maze import as_matrix, import_maze_details
+from MazeIndex import MazeIndex
+from TraversalBuilder import TraversalBuilder
+from maze import import_maze_details
 
-from queue import PriorityQueue
+Heuristic = Callable[[tuple[int,int], tuple[int,int]], int]
+
+def manhattan(a:tuple[int,int], b:tuple[int,int]) -> int:
+    '''Calculate the Manhattan distance between two coordinates'''
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
 def heuristic(a:Cell, b:Cell):
     '''Calculate the Manhattan distance between two cells'''
-    return abs(a.X - b.X) + abs(a.Y - b.Y)
-
-def a_star_search(maze_info):
-    #Run A* search on the maze
-    starting_cell:Cell = maze_info['start']
-    ending_cell:Cell = maze_info['end']
-    maze:dict[Cell,list[Cell]] = maze_info['graph']
+    return manhattan(a.coordinate, b.coordinate)
 
-    # Initialize priority queue with starting cell
-    queue: PriorityQueue[tuple[int,Cell]] = PriorityQueue()
-    queue.put((0, starting_cell))
+def a_star(index:MazeIndex, start:int, end:int, heuristic:Heuristic=manhattan, stats:dict[str,int]|None=None, walk_limit:int|None=None):
+    """Run A* search between two nodes of a MazeIndex. Returns a tuple containing the nodes of the path (None if there is none) and the traversal order.
 
-    cost_so_far: dict[Cell, int] = {starting_cell: 0}
-    path: dict[Cell, Cell|None] = {starting_cell: None}
-    visited_cells = [starting_cell.coordinate]
-    matrix = as_matrix(maze)
-    marker = starting_cell
-    while not queue.empty():
-        _, current_cell= queue.get()
-        subpath, _ = depth_first_search(matrix, marker, current_cell)
-        subpath.pop()
-        visited_cells.extend(subpath)
-        marker = current_cell
+    The open set is a heap of (f, h, counter, node) entries: ties on f go to the node closer to the goal, then to the oldest entry.
+    Nodes are closed once expanded and any entry left in the heap for a closed node is skipped.
+    If a stats dict is given, the number of expanded nodes and the largest size of the heap are stored in it under "expanded" and "peak_heap".
+    The traversal is cut short once it is `walk_limit` coordinates long, see `TraversalBuilder`.
+    """
+    coordinate = index.coordinate
+    goal = coordinate(end)
+    cost_so_far = array('i', [-1]) * len(index)
+    cost_so_far[start] = 0
+    closed = bytearray(len(index))
+    h = heuristic(coordinate(start), goal)
+    heap = [(h, h, 0, start)]
+    counter = 1
+    expanded = 0
+    peak_heap = 1
+    builder = TraversalBuilder(index, start, walk_limit)
+    builder.traversal.append(coordinate(start))
+    path = None
+    while heap:
+        _, _, _, current = heappop(heap)
+        if closed[current]:
+            # A cheaper entry for this node has already been expanded
+            continue
+        closed[current] = 1
+        expanded += 1
+        builder.walk_to(current)
 
-        if current_cell == ending_cell:
-            visited_cells.append(current_cell.coordinate)
-            path_list:list[Cell] = [ending_cell]
-            while path[path_list[-1]] is not None:
-                path_list.append(path[path_list[-1]]) # type: ignore since the check above is not None
-            path_list.reverse()
-            return path_list, visited_cells
-        for neighbor in maze[current_cell]:
-            new_cost = cost_so_far[current_cell] + 1
-            if neighbor not in cost_so_far or new_cost < cost_so_far[neighbor]:
+        if current == end:
+            if not builder.truncated:
+                builder.traversal.append(goal)
+            path = builder.path_to(end)
+            break
+        new_cost = cost_so_far[current] + 1
+        for neighbor in index.neighbors(current):
+            if closed[neighbor]:
+                continue
+            if cost_so_far[neighbor] == -1 or new_cost < cost_so_far[neighbor]:
                 cost_so_far[neighbor] = new_cost
-                priority = new_cost + heuristic(ending_cell, neighbor)
-                queue.put((priority, neighbor))  
-                path[neighbor] = current_cell
-               
+                h = heuristic(coordinate(neighbor), goal)
+                heappush(heap, (new_cost + h, h, counter, neighbor))
+                counter += 1
+                builder.discover(neighbor, current)
+        if len(heap) > peak_heap:
+            peak_heap = len(heap)
+
+    if stats is not None:
+        stats["expanded"] = expanded
+        stats["peak_heap"] = peak_heap
+    return path, builder.traversal
+
+def a_star_search(maze_info, heuristic:Heuristic=manhattan, stats:dict[str,int]|None=None, walk_limit:int|None=None):
+    #Run A* search on the maze, the graph can be an adjacency list or a MazeIndex
+    starting_cell:Cell = maze_info['start']
+    ending_cell:Cell = maze_info['end']
+    maze:dict[Cell,list[Cell]] | MazeIndex = maze_info['graph']
+    index = maze if isinstance(maze, MazeIndex) else MazeIndex.from_edgelist(maze)
+    path, traversal = a_star(index, index.node(starting_cell), index.node(ending_cell), heuristic, stats, walk_limit)
     # If ending cell was not found, return None
-    return None, visited_cells
+    if path is None:
+        return None, traversal
+    return [index.cell(node) for node in path], traversal
 def parse_cli_args() :
     from argparse import ArgumentParser
     from sys import argv
     parser = ArgumentParser(description='Solves  a maze using A* search')
     parser.add_argument('-f', '--file', type=str, help='reads a json file containing a maze')
+    parser.add_argument('-stats', '--stats', action='store_true', help='prints the number of expanded nodes and the peak size of the heap')
     if len(argv) == 1:
         parser.print_help()
         exit(0)
@@ -62,8 +95,11 @@ def main():
     args = parse_cli_args()
     if args.file:
         maze_info = import_maze_details(args.file)
-        path = a_star_search(maze_info)
+        stats:dict[str,int] = {}
+        path, _ = a_star_search(maze_info, stats=stats)
         print("No path" if path == None else " -> ".join([str(cell) for cell in path]))
+        if args.stats:
+            print("Expanded:", stats["expanded"], "Peak heap size:", stats["peak_heap"])
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,91 @@
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from maze import BINARY_EXTENSION, run_to_completion, save_maze
+from maze_cache import GENERATORS, maze_seed
+
+def maze_path(directory:str, number:int, shard_size:int, extension:str) -> str:
+    """Returns where a maze of a batch is written: every shard directory holds `shard_size` mazes"""
+    return os.path.join(directory, f"shard_{number // shard_size:05d}", f"maze_{number:08d}{extension}")
+
+def generate_one(algorithm:str, length:int, width:int, seed:int, path:str) -> int:
+    """Generates and writes a single maze, returns the number of cells it has. Runs in the worker processes."""
+    start, end, maze, _ = run_to_completion(GENERATORS[algorithm](length, width, random.Random(seed)))
+    save_maze(maze, (start, end), path, seed=seed)
+    return length * width
+
+def generate_batch(algorithm:str, length:int, width:int, count:int, directory:str, base_seed:int, workers:int|None=None, shard_size:int=1000, extension:str=BINARY_EXTENSION, report=None):
+    """Generates `count` mazes across a pool of processes, writing them to sharded directories as they finish.
+    `report(done, cells, elapsed)` is called whenever a maze is written. Returns the number of cells generated."""
+    for shard in range((count + shard_size - 1) // shard_size):
+        os.makedirs(os.path.join(directory, f"shard_{shard:05d}"), exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    numbers = range(count)
+    started = time.perf_counter()
+    cells = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            generate_one,
+            repeat(algorithm, count),
+            repeat(length, count),
+            repeat(width, count),
+            (maze_seed(base_seed, number) for number in numbers),
+            (maze_path(directory, number, shard_size, extension) for number in numbers),
+            # Hand out work in chunks so small mazes aren't dominated by the cost of sending tasks between processes
+            chunksize=max(1, count // (workers * 8)),
+        )
+        for done, maze_cells in enumerate(results, 1):
+            cells += maze_cells
+            if report is not None:
+                report(done, cells, time.perf_counter() - started)
+    return cells
+
+def parse_cli_args() :
+    import argparse
+    from sys import argv
+    parser = argparse.ArgumentParser(description='Generate\'s a batch of mazes using every core')
+    parser.add_argument('-a', '--algorithm', required=True, choices=list(GENERATORS), help='The generator to use')
+    parser.add_argument('-l', '--length', required=True, type=int, help='The length of the mazes to be made')
+    parser.add_argument('-w', '--width',required=True,  type=int, help='The width of the mazes to be made')
+    parser.add_argument('-n', '--count', required=True, type=int, help='The number of mazes to be made')
+    parser.add_argument('-o', '--output', required=True, type=str, help='The directory to write the mazes to')
+    parser.add_argument('-seed', '--seed', type=int, help='The seed of the batch, the same seed always makes the same mazes')
+    parser.add_argument('-workers', '--workers', type=int, help='The number of processes to use, all cores by default')
+    parser.add_argument('-shard', '--shard', type=int, default=1000, help='The number of mazes in every directory of the output')
+    parser.add_argument('-json', '--json', action='store_true', help=f'Write the mazes as adjacency lists instead of the binary ({BINARY_EXTENSION}) format')
+    if len(argv) == 1:
+        parser.print_help()
+        exit(0)
+    return parser.parse_args(argv[1:])
+
+def main():
+    '''Run if main module'''
+    args = parse_cli_args()
+    seed = args.seed if args.seed is not None else random.getrandbits(31)
+    print(f"Generating {args.count} {args.algorithm} mazes of {args.width}x{args.length} with seed {seed}", file=sys.stderr)
+    last_report = [0.0]
+    def report(done:int, cells:int, elapsed:float):
+        # Only print about once a second, and always for the last maze
+        if elapsed - last_report[0] < 1 and done != args.count:
+            return
+        last_report[0] = elapsed
+        print(f"\r{done}/{args.count} mazes, {done / elapsed:.1f} mazes/sec, {cells / elapsed:,.0f} cells/sec", end="", file=sys.stderr)
+    generate_batch(
+        args.algorithm,
+        args.length,
+        args.width,
+        args.count,
+        args.output,
+        seed,
+        workers=args.workers,
+        shard_size=args.shard,
+        extension=".json" if args.json else BINARY_EXTENSION,
+        report=report,
+    )
+    print(file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+from collections import deque
+from Cell import Cell
+from MazeIndex import MazeIndex
+from TraversalBuilder import TraversalBuilder
+from maze import import_maze_details
+
+def bidirectional_bfs(graph:dict[Cell, list[Cell]] | MazeIndex, start:Cell, end:Cell, stats:dict[str,int]|None=None, walk_limit:int|None=None):
+    '''Run breadth first search from both the start and the end of the maze until the two searches meet.
+    Returns a tuple containing the path and the traversal order. The traversal is a single walk: the walk of the search from
+    the start up to the meeting point, then the walk of the search from the end played backwards, so it ends on the end cell.
+    If a stats dict is given, the number of expanded nodes and the largest size of a frontier are stored in it under "expanded" and "peak_queue".
+    The traversal is cut short once it is `walk_limit` coordinates long, see `TraversalBuilder`.'''
+    index = graph if isinstance(graph, MazeIndex) else MazeIndex.from_edgelist(graph)
+    start_node = index.node(start)
+    end_node = index.node(end)
+    # Every search records its own walk, they are joined at the meeting point once the searches are done
+    builders = (TraversalBuilder(index, start_node, walk_limit), TraversalBuilder(index, end_node, walk_limit))
+    seen = (bytearray(len(index)), bytearray(len(index)))
+    seen[0][start_node] = 1
+    seen[1][end_node] = 1
+    frontiers = [deque([start_node]), deque([end_node])]
+    expanded = 0
+    peak_queue = 1
+    # The node reached from the start and the node reached from the end on either side of the meeting point
+    meeting: tuple[int,int]|None = (start_node, end_node) if start_node == end_node else None
+
+    while meeting is None and frontiers[0] and frontiers[1]:
+        # Grow the smaller frontier by a whole level
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        builder, other = builders[side], builders[1 - side]
+        own_seen, other_seen = seen[side], seen[1 - side]
+        next_level: deque[int] = deque()
+        # The shortest (length, node, neighbor) that crosses over to the other search
+        best: tuple[int,int,int]|None = None
+        for node in frontiers[side]:
+            expanded += 1
+            builder.walk_to(node)
+            for neighbor in index.neighbors(node):
+                if other_seen[neighbor]:
+                    length = builder.depth[node] + 1 + other.depth[neighbor]
+                    if best is None or length < best[0]:
+                        best = (length, node, neighbor)
+                if not own_seen[neighbor]:
+                    own_seen[neighbor] = 1
+                    builder.discover(neighbor, node)
+                    next_level.append(neighbor)
+        frontiers[side] = next_level
+        if len(next_level) > peak_queue:
+            peak_queue = len(next_level)
+        # Finish the level before stopping, another crossing in it may be shorter
+        if best is not None:
+            _, node, neighbor = best
+            meeting = (node, neighbor) if side == 0 else (neighbor, node)
+
+    if stats is not None:
+        stats["expanded"] = expanded
+        stats["peak_queue"] = peak_queue
+    coordinate = index.coordinate
+    traversal = builders[0].traversal
+    if meeting is None:
+        return [], traversal
+    from_start, from_end = meeting
+    path = builders[0].path_to(from_start)
+    if from_end != from_start:
+        path.extend(reversed(builders[1].path_to(from_end)))
+    # Walk on to the meeting point and across it, then back over the walk of the other search
+    builders[0].walk_to(from_start)
+    if not builders[0].truncated:
+        traversal.append(coordinate(from_start))
+        if builders[1].truncated:
+            # The other walk is cut short and doesn't reach the meeting point, go straight to the end instead
+            traversal.extend([coordinate(node) for node in reversed(builders[1].path_to(from_end))])
+        else:
+            builders[1].walk_to(from_end)
+            traversal.append(coordinate(from_end))
+            traversal.extend(reversed(builders[1].traversal))
+        if walk_limit is not None:
+            del traversal[walk_limit:]
+    return [index.cell(node) for node in path], traversal
+
+def parse_cli_args() :
+    import argparse
+    from sys import argv
+    parser = argparse.ArgumentParser(description='Solves a maze using Bidirectional Breadth First Search')
+    parser.add_argument('-f', '--file', type=str, required=True, help='reads a json file containing a maze')
+    parser.add_argument('-stats', '--stats', action='store_true', help='prints the number of expanded nodes and the peak size of the frontiers')
+    if len(argv) == 1:
+        parser.print_help()
+        exit(0)
+    return parser.parse_args(argv[1:])
+def main():
+    '''Run if main module'''
+    args = parse_cli_args()
+    if args.file:
+        maze_info = import_maze_details(args.file)
+        stats:dict[str,int] = {}
+        path,traversal = bidirectional_bfs(**maze_info, stats=stats)
+        print("No path" if not path else " -> ".join([str(cell) for cell in path]))
+        if args.stats:
+            print("Expanded:", stats["expanded"], "Peak queue size:", stats["peak_queue"])
+
+if __name__ == '__main__':
+    main()
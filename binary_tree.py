@@ -0,0 +1,89 @@
+import random
+from array import array
+import numpy as np
+from Direction import Direction
+from carve_events import LOG_EXTENSION, append_events
+from MazeGrid import WALL_BITS, GridCell, MazeGrid
+from maze import BINARY_EXTENSION, default_rng, generate_for_cli, random_cell, seed_arg
+
+WEST, NORTH = WALL_BITS[Direction.WEST], WALL_BITS[Direction.NORTH]
+EAST, SOUTH = WALL_BITS[Direction.EAST], WALL_BITS[Direction.SOUTH]
+
+def carve_binary_tree(length:int, width:int, rng:np.random.Generator|None=None) -> np.ndarray:
+    """Carves a whole binary tree maze with array operations and returns its wall bits as a (length, width) uint8 array,
+    laid out like MazeGrid.cells. Every cell carves either north or west, so the maze is a tree rooted at the top left cell."""
+    rng = np.random.default_rng() if rng is None else rng
+    # 1. Flip a coin for every cell: carve north or west
+    north = rng.integers(0, 2, size=(length, width), dtype=np.uint8).astype(bool)
+    # 2. Cells along the top can only go west and cells along the left can only go north
+    north[0, :] = False
+    north[:, 0] = True
+    north[0, 0] = False
+    west = ~north
+    west[:, 0] = False
+    # 3. Set the bits on both sides of every carved wall
+    cells = north * np.uint8(NORTH) | west * np.uint8(WEST)
+    cells[:-1, :] |= north[1:, :] * np.uint8(SOUTH)
+    cells[:, :-1] |= west[:, 1:] * np.uint8(EAST)
+    return cells
+
+def binary_tree_grid(length:int, width:int, rng:np.random.Generator|None=None) -> MazeGrid:
+    """Returns a binary tree maze as a MazeGrid sharing the memory of the carved array"""
+    return MazeGrid(length, width, memoryview(carve_binary_tree(length, width, rng).reshape(-1)))
+
+def binary_tree(length:int, width:int, animate:bool=True, record:bool=False, events:array|None=None, rng:random.Random|None=None):
+    """ based on the Binary Tree algorithm:\n
+    https://en.wikipedia.org/wiki/Maze_generation_algorithm
+        Returns a tuple containing the STARTING cell, ENDING cell, and a generator function for creating the maze based on those cells.
+    """
+    rng = default_rng(rng)
+    maze = MazeGrid(length, width)
+    STARTING_CELL = random_cell(maze, rng)
+    ENDING_CELL = random_cell(maze, rng)
+    numpy_rng = np.random.default_rng(rng.getrandbits(64))
+    traversal: list[GridCell] | array = [] if animate else array('I')
+
+    def _generator():
+        carved = carve_binary_tree(length, width, numpy_rng)
+        if not animate:
+            maze.cells[:] = carved.tobytes()
+            maze.version += 1
+            if events is not None:
+                append_events(events, carved)
+            if record:
+                traversal.extend(range(width - 1, length * width, width))
+            yield maze, traversal
+            return
+        yield maze, traversal
+        for y in range(length):
+            maze.cells[y * width:(y + 1) * width] = carved[y].tobytes()
+            maze.version += 1
+            if events is not None:
+                append_events(events, carved[y], y * width)
+            traversal.append(GridCell(maze, width - 1, y))
+            yield maze, traversal
+
+    return STARTING_CELL, ENDING_CELL, _generator(), maze, traversal
+
+def parse_cli_args() :
+    import argparse
+    from sys import argv
+    parser = argparse.ArgumentParser(description='Generate\'s a maze using the Binary Tree algorithm')
+    parser.add_argument('-l', '--length', required=True, type=int, help='The length of the maze to be made')
+    parser.add_argument('-w', '--width',required=True,  type=int, help='The width of the maze to be made')
+    parser.add_argument('-seed', '--seed', type=seed_arg, help='Seed the random number generator, the same seed always makes the same maze')
+    parser.add_argument('-export', '--export',required=True,  type=str, help=f'Export the created maze to a file as an adjacency list, or in the binary format if it ends with {BINARY_EXTENSION}')
+    parser.add_argument('-log', '--log', type=str, help=f'Also write every carved wall to a generation log ({LOG_EXTENSION}), see carve_events.py')
+    if len(argv) == 1:
+        parser.print_help()
+        exit(0)
+    return parser.parse_args(argv[1:])
+
+def main():
+    '''Run if main module'''
+    args = parse_cli_args()
+    if args.length and args.width:
+        generate_for_cli(lambda **options: binary_tree(args.length, args.width, **options), args)
+
+if __name__ == '__main__':
+    main()
@@ -1,56 +1,59 @@
+from collections import deque
 from Cell import Cell
-from depth_first_search import depth_first_search
-from maze import as_matrix, import_maze_details
+from MazeIndex import MazeIndex
+from TraversalBuilder import TraversalBuilder
+from maze import import_maze_details
 
-def breadth_first_search(graph:dict[Cell, list[Cell]], start:Cell, end:Cell):
-    '''Run breath first search on the maze'''
+def breadth_first_search(graph:dict[Cell, list[Cell]] | MazeIndex, start:Cell, end:Cell, stats:dict[str,int]|None=None, walk_limit:int|None=None):
+    '''Run breath first search on the maze, given as an adjacency list or its MazeIndex.
+    The traversal is cut short once it is `walk_limit` coordinates long, see `TraversalBuilder`.
+    If a stats dict is given, the number of expanded nodes and the largest size of the queue are stored in it under "expanded" and "peak_queue".'''
+    index = graph if isinstance(graph, MazeIndex) else MazeIndex.from_edgelist(graph)
+    start_node = index.node(start)
+    end_node = index.node(end)
        # Initialize queue with starting cell
-    queue = [start]
+    queue = deque([start_node])
 
     # Initialize visited set with starting cell
-    visited = set([start])
-    matrix = as_matrix(graph)
+    visited = set([start_node])
 
-    # Initialize path dictionary with starting cell
-    path: dict[Cell, Cell|None] = {start: None}
-    traversal:list[tuple[int,int]]  = []
+    # Records the parent of every visited node, and the walk between consecutive cells taken from the queue
+    builder = TraversalBuilder(index, start_node, walk_limit)
+    expanded = 0
+    peak_queue = 1
+    path:list[Cell] = []
     # Loop until queue is empty or ending cell is found
-    def backtrack(cell:Cell):
-        path_list:list[Cell] = [cell]
-        while path[path_list[-1]] != None:
-            path_list.append(path[path_list[-1]]) # type: ignore
-        path_list.reverse()
-        return path_list
-
-    prev_start =  start
     while queue:
         # Get next cell from queue
-        current_cell = queue.pop(0)
-        # Purely to show the movement from the current child to the previously visited node, do a dfs
-        subpath, _ = depth_first_search(matrix, prev_start, current_cell)
-        if subpath:
-            # we dont need current cell in the subpath, it will be included in the next subpath
-            subpath.pop()
-        traversal.extend(subpath)
-        prev_start = current_cell
+        current_node = queue.popleft()
+        expanded += 1
+        # Purely to show the movement from the previously visited node to the current child
+        builder.walk_to(current_node)
         # Check if current cell is the ending cell
-        if current_cell == end:
-            return backtrack(current_cell), traversal
+        if current_node == end_node:
+            path = [index.cell(n) for n in builder.path_to(current_node)]
+            break
 
         # Add unvisited neighbors to queue and visited set
-        for child in graph[current_cell]:
+        for child in index.neighbors(current_node):
             if child not in visited:
                 queue.append(child)
                 visited.add(child)   
-                path[child] = current_cell
+                builder.discover(child, current_node)
+        if len(queue) > peak_queue:
+            peak_queue = len(queue)
 
-    # If ending cell was not found, return None
-    return [], traversal
+    if stats is not None:
+        stats["expanded"] = expanded
+        stats["peak_queue"] = peak_queue
+    # If ending cell was not found, the path is empty
+    return path, builder.traversal
 def parse_cli_args() :
     import argparse
     from sys import argv
     parser = argparse.ArgumentParser(description='Solves a maze using Breadth First Search')
     parser.add_argument('-f', '--file', type=str, required=True, help='reads a json file containing a maze')
+    parser.add_argument('-stats', '--stats', action='store_true', help='prints the number of expanded nodes and the peak size of the queue')
     if len(argv) == 1:
         parser.print_help()
         exit(0)
@@ -60,8 +63,11 @@ def main():
     args = parse_cli_args()
     if args.file:
         maze_info = import_maze_details(args.file)
-        path,traversal = breadth_first_search(**maze_info)
+        stats:dict[str,int] = {}
+        path,traversal = breadth_first_search(**maze_info, stats=stats)
         print("No path" if path == None else " -> ".join([str(cell) for cell in path]))
+        if args.stats:
+            print("Expanded:", stats["expanded"], "Peak queue size:", stats["peak_queue"])
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,125 @@
+import struct
+import sys
+from array import array
+from typing import Iterable
+from Cell import Cell
+from Direction import DIRECTIONS, DX, DY, DIRECTION_INDEX, Direction
+from MazeGrid import WALL_BITS, MazeGrid
+from maze import BINARY_EXTENSION, save_maze
+
+# A carve event removes the wall of the cell at node `y * width + x` towards a direction.
+# It is packed in a single int as `(node << 2) | DIRECTION_INDEX[direction]`, so a generation is an array('I') of them.
+
+# Generation log file:
+#   header: magic, version, width, length, start x, start y, end x, end y, number of events
+#   body:   the packed events as little endian uint32
+LOG_EXTENSION = ".mazelog"
+LOG_MAGIC = b"MZEV"
+LOG_VERSION = 1
+LOG_HEADER = struct.Struct("<4sHIIIIIIQ")
+
+def new_events() -> array:
+    """Returns an empty event stream to pass to a generator as `events`"""
+    return array('I')
+
+def pack_event(x:int, y:int, direction:Direction, width:int) -> int:
+    return ((y * width + x) << 2) | DIRECTION_INDEX[direction]
+
+def unpack_event(event:int, width:int) -> tuple[int, int, Direction]:
+    """Returns the (x, y, direction) of a packed event"""
+    node = event >> 2
+    return (node % width, node // width, DIRECTIONS[event & 3])
+
+def append_events(events:array, carved, first_node:int=0):
+    """Appends a carve event for every north and west passage of a NumPy array of carved cells, starting at node `first_node`.
+    Every passage is the north or west wall of exactly one cell, so this lists each of them once."""
+    flat = carved.reshape(-1)
+    for d in (Direction.NORTH, Direction.WEST):
+        nodes = (flat & WALL_BITS[d]).nonzero()[0].astype('uint32') + first_node
+        events.frombytes(((nodes << 2) | DIRECTION_INDEX[d]).tobytes())
+
+def apply_events(maze:list[list[Cell]], events:Iterable[int]):
+    """Carves the walls of a stream of events into a maze, a MazeGrid or a matrix of Cells"""
+    width = len(maze[0])
+    if isinstance(maze, MazeGrid):
+        cells = maze.cells
+        steps = [DY[d] * width + DX[d] for d in DIRECTIONS]
+        bits = [WALL_BITS[d] for d in DIRECTIONS]
+        # The wall on the other side is 2 positions further in DIRECTIONS
+        for event in events:
+            node, d = event >> 2, event & 3
+            cells[node] |= bits[d]
+            cells[node + steps[d]] |= bits[(d + 2) & 3]
+        maze.version += 1
+        return
+    for event in events:
+        x, y, direction = unpack_event(event, width)
+        maze[y][x].visit(maze[y + DY[direction]][x + DX[direction]], direction)
+
+def touched_cells(events:Iterable[int], width:int) -> set[tuple[int, int]]:
+    """Returns the coordinates of the cells on both sides of every carved wall"""
+    touched: set[tuple[int, int]] = set()
+    for event in events:
+        x, y, direction = unpack_event(event, width)
+        touched.add((x, y))
+        touched.add((x + DX[direction], y + DY[direction]))
+    return touched
+
+def write_log(events:array, length:int, width:int, startEnd:tuple[Cell,Cell], filepath:str):
+    """Writes a stream of events to a generation log"""
+    start, end = startEnd
+    with open(filepath, 'wb') as f:
+        f.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, width, length, start.X, start.Y, end.X, end.Y, len(events)))
+        if sys.byteorder == "big":
+            events = array('I', events)
+            events.byteswap()
+        events.tofile(f)
+
+def read_log(filepath:str):
+    """Reads a generation log and returns its events, dimensions and endpoints"""
+    with open(filepath, 'rb') as f:
+        magic, version, width, length, start_x, start_y, end_x, end_y, count = LOG_HEADER.unpack(f.read(LOG_HEADER.size))
+        if magic != LOG_MAGIC:
+            raise ValueError(f"{filepath} is not a generation log")
+        if version != LOG_VERSION:
+            raise ValueError(f"Unsupported generation log version {version}, expected {LOG_VERSION}")
+        events = array('I')
+        events.fromfile(f, count)
+    if sys.byteorder == "big":
+        events.byteswap()
+    return {
+        "events": events,
+        "length": length,
+        "width": width,
+        "start": (start_x, start_y),
+        "end": (end_x, end_y),
+    }
+
+def replay(filepath:str):
+    """Rebuilds the maze a generation log was recorded from, returns it with its start and end cells"""
+    log = read_log(filepath)
+    maze = MazeGrid(log["length"], log["width"])
+    apply_events(maze, log["events"])
+    (start_x, start_y), (end_x, end_y) = log["start"], log["end"]
+    return maze, maze[start_y][start_x], maze[end_y][end_x]
+
+def parse_cli_args() :
+    import argparse
+    from sys import argv
+    parser = argparse.ArgumentParser(description='Replays a generation log into a maze file')
+    parser.add_argument('-f', '--file', type=str, required=True, help=f'reads a generation log ({LOG_EXTENSION}) file')
+    parser.add_argument('-export', '--export',required=True,  type=str, help=f'Export the maze to a file as an adjacency list, or in the binary format if it ends with {BINARY_EXTENSION}')
+    if len(argv) == 1:
+        parser.print_help()
+        exit(0)
+    return parser.parse_args(argv[1:])
+
+def main():
+    '''Run if main module'''
+    args = parse_cli_args()
+    if args.file:
+        maze, start, end = replay(args.file)
+        save_maze(maze, (start, end), args.export)
+
+if __name__ == '__main__':
+    main()
@@ -1,29 +1,55 @@
+from array import array
 from Cell import Cell
-from State import State
+from MazeIndex import MazeIndex, index_of
 from maze import as_matrix, import_maze_details
 
-def depth_first_search(maze: list[list[Cell]], start:Cell, end:Cell):
-    """Run depth first search on a matrix representation of the maze. Returns a tuple containing the path and the entire traversal order"""
-    stack = [(start, [start.coordinate])]
-    visited = set()
-    traversal_order = [start.coordinate]
+def depth_first_search(maze: list[list[Cell]] | MazeIndex, start:Cell, end:Cell, stats:dict[str,int]|None=None, walk_limit:int|None=None):
+    """Run depth first search on a matrix representation of the maze, or its MazeIndex. Returns a tuple containing the path and the entire traversal order.
+    The traversal order stops growing once it is `walk_limit` coordinates long.
+    If a stats dict is given, the number of expanded nodes and the largest size the stack reached are stored in it under "expanded" and "peak_stack"."""
+    index = maze if isinstance(maze, MazeIndex) else index_of(maze)
+    start_node = index.node(start)
+    end_node = index.node(end)
+    coordinate = index.coordinate
+    # Instead of copying the path so far into every stack entry, remember where each node was reached from
+    parent = array('i', [-1]) * len(index)
+    visited = bytearray(len(index))
+    stack = [start_node]
+    expanded = 0
+    peak_stack = 1
+    traversal_order = [coordinate(start_node)]
+    path:list[tuple[int,int]] = []
     while stack:
-        current, path = stack.pop()
+        current = stack.pop()
 
         # Every loop, add the current cell's coordinate to the traversal list
-        traversal_order.append(current.coordinate)
-        if current == end:
-            return path, traversal_order
-        if current not in visited:
-            visited.add(current)
-            for neighbor in current.visited_walls():
-                next_cell = maze[current.Y + neighbor.value[1]][current.X + neighbor.value[0]]
-                if next_cell in visited:
+        if walk_limit is None or len(traversal_order) < walk_limit:
+            traversal_order.append(coordinate(current))
+        if current == end_node:
+            # Rebuild the path once, by following the parents back to the start
+            while current != start_node:
+                path.append(coordinate(current))
+                current = parent[current]
+            path.append(coordinate(start_node))
+            path.reverse()
+            break
+        if not visited[current]:
+            visited[current] = 1
+            expanded += 1
+            for next_node in index.neighbors(current):
+                if visited[next_node]:
                     continue
-                stack.append((current, path + [current.coordinate]))
-                stack.append((next_cell, path + [next_cell.coordinate]))
+                # Put back current, so the traversal walks back to it once next_node is done
+                stack.append(current)
+                stack.append(next_node)
+                parent[next_node] = current
+            if len(stack) > peak_stack:
+                peak_stack = len(stack)
 
-    return [], traversal_order
+    if stats is not None:
+        stats["expanded"] = expanded
+        stats["peak_stack"] = peak_stack
+    return path, traversal_order
 
 def print_path(path):
     if path:
@@ -35,6 +61,7 @@ def parse_cli_args() :
     from sys import argv
     parser = argparse.ArgumentParser(description='Solves  a maze using Depth First Search')
     parser.add_argument('-f', '--file', type=str, required=True, help='reads a json file containing a maze')
+    parser.add_argument('-stats', '--stats', action='store_true', help='prints the number of expanded nodes and the peak size of the stack')
     if len(argv) == 1:
         parser.print_help()
         exit(0)
@@ -45,8 +72,11 @@ def main():
     if args.file:
         maze_info = import_maze_details(args.file)
         maze_matrix = as_matrix(maze_info['graph'])
-        path, traversal = depth_first_search(maze_matrix, maze_info['start'], maze_info['end'])
+        stats:dict[str,int] = {}
+        path, traversal = depth_first_search(maze_matrix, maze_info['start'], maze_info['end'], stats)
         print_path(path)
+        if args.stats:
+            print("Expanded:", stats["expanded"], "Peak stack size:", stats["peak_stack"])
         # print_path(traversal)
 
 if __name__ == '__main__':
@@ -0,0 +1,128 @@
+import random
+from array import array
+from typing import Iterator
+from Cell import Cell
+from Direction import DIRECTION_INDEX, Direction
+from carve_events import LOG_EXTENSION, new_events, write_log
+from MazeGrid import WALL_BITS
+from maze import BINARY_EXTENSION, default_rng, export_binary_rows, seed_arg
+
+EAST, WEST = WALL_BITS[Direction.EAST], WALL_BITS[Direction.WEST]
+SOUTH, NORTH = WALL_BITS[Direction.SOUTH], WALL_BITS[Direction.NORTH]
+
+def eller(length:int, width:int, rng:random.Random|None=None) -> Iterator[bytearray]:
+    """ based on Eller's algorithm:\n
+    https://en.wikipedia.org/wiki/Maze_generation_algorithm
+        Yields the maze one row at a time, as the wall bits of its cells laid out like MazeGrid.cells.
+    """
+    rng = default_rng(rng)
+    # The set every cell of the current row belongs to. Cells carved into from the row above inherit its set.
+    labels: list[int|None] = [None] * width
+    next_label = 0
+    # Which cells of the current row were carved into from the row above
+    carved_north = bytearray(width)
+    for y in range(length):
+        last_row = y == length - 1
+        row = bytearray(width)
+        # 1. Put every cell that isn't part of a set yet into its own set
+        for x in range(width):
+            if carved_north[x]:
+                row[x] |= NORTH
+            if labels[x] is None:
+                labels[x] = next_label
+                next_label += 1
+
+        # 2. Randomly join adjacent cells of different sets, the last row joins all of them.
+        # Sets are merged with a union-find over the labels of this row
+        parent: dict[int, int] = {}
+        def find(label:int) -> int:
+            root = label
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while label != root:
+                parent[label], label = root, parent[label]
+            return root
+        for x in range(width - 1):
+            left, right = find(labels[x]), find(labels[x + 1]) # type: ignore
+            if left != right and (last_row or rng.random() < 0.5):
+                row[x] |= EAST
+                row[x + 1] |= WEST
+                parent[right] = left
+        roots = [find(label) for label in labels] # type: ignore
+
+        # 3. Carve down from at least one cell of every set
+        next_labels: list[int|None] = [None] * width
+        carved_north = bytearray(width)
+        if not last_row:
+            members: dict[int, list[int]] = {}
+            for x, root in enumerate(roots):
+                members.setdefault(root, []).append(x)
+            for root, xs in members.items():
+                down = [x for x in xs if rng.random() < 0.5] or [rng.choice(xs)]
+                for x in down:
+                    row[x] |= SOUTH
+                    carved_north[x] = 1
+                    next_labels[x] = root
+        labels = next_labels
+        yield row
+
+def log_rows(rows:Iterator[bytearray], width:int, events:array) -> Iterator[bytearray]:
+    """Passes the rows through, appending a carve event for the north and west passages of every cell to `events`"""
+    north, west = DIRECTION_INDEX[Direction.NORTH], DIRECTION_INDEX[Direction.WEST]
+    for y, row in enumerate(rows):
+        for x, bits in enumerate(row):
+            if bits & NORTH:
+                events.append(((y * width + x) << 2) | north)
+            if bits & WEST:
+                events.append(((y * width + x) << 2) | west)
+        yield row
+
+def show_rows(rows:Iterator[bytearray], width:int, start:tuple[int,int], end:tuple[int,int]):
+    """Prints the maze to the stdout as its rows arrive, in the same style as maze.show_maze"""
+    for y, row in enumerate(rows):
+        print("".join("+   " if bits & NORTH else "+---" for bits in row) + "+")
+        line = ""
+        for x, bits in enumerate(row):
+            line += "  " if bits & WEST else "| "
+            line += "⬤ " if (x, y) == start else "X " if (x, y) == end else "  "
+        print(line + "|")
+    print("+---" * width + "+")
+
+def parse_cli_args() :
+    import argparse
+    from sys import argv
+    parser = argparse.ArgumentParser(description='Generate\'s a maze one row at a time using Eller\'s algorithm')
+    parser.add_argument('-l', '--length', required=True, type=int, help='The length of the maze to be made')
+    parser.add_argument('-w', '--width',required=True,  type=int, help='The width of the maze to be made')
+    parser.add_argument('-seed', '--seed', type=seed_arg, help='Seed the random number generator, the same seed always makes the same maze')
+    parser.add_argument('-export', '--export', type=str, help=f'Stream the created maze to a binary ({BINARY_EXTENSION}) file instead of printing it')
+    parser.add_argument('-log', '--log', type=str, help=f'Also write every carved wall to a generation log ({LOG_EXTENSION}), see carve_events.py')
+    if len(argv) == 1:
+        parser.print_help()
+        exit(0)
+    return parser.parse_args(argv[1:])
+
+def main():
+    '''Run if main module'''
+    args = parse_cli_args()
+    if args.length and args.width:
+        # The rows are never all in memory, so the endpoints are picked before generating
+        rng = random.Random(args.seed)
+        start = (rng.randint(0, args.width - 1), rng.randint(0, args.length - 1))
+        end = (rng.randint(0, args.width - 1), rng.randint(0, args.length - 1))
+        rows = eller(args.length, args.width, rng)
+        # The log is written once every row has been made, the events are the only part of the maze kept in memory
+        events = new_events() if args.log else None
+        if events is not None:
+            rows = log_rows(rows, args.width, events)
+        if args.export:
+            if not args.export.endswith(BINARY_EXTENSION):
+                raise SystemExit(f"Only the binary format can be streamed, the export path must end with {BINARY_EXTENSION}")
+            export_binary_rows(rows, args.length, args.width, (Cell(*start), Cell(*end)), args.export, args.seed)
+        else:
+            show_rows(rows, args.width, start, end)
+        if events is not None:
+            write_log(events, args.length, args.width, (Cell(*start), Cell(*end)), args.log)
+
+if __name__ == '__main__':
+    main()
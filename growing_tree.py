@@ -0,0 +1,263 @@
+import random
+from array import array
+from collections import deque
+from typing import Callable
+from Cell import Cell
+from Direction import DIRECTION_INDEX, DIRECTIONS, DX, DY, INVERSE, Direction
+from MazeGrid import WALL_BITS, GridCell, MazeGrid
+from State import State
+from carve_events import LOG_EXTENSION
+from maze import BINARY_EXTENSION, default_rng, generate_for_cli, make_initial_maze, new_traversal, random_cell, seed_arg
+
+# A policy picks which cell of the frontier grows next. It gets the number of cells in the frontier and the
+# random number generator of the maze, and returns the position of the chosen one, counted from the oldest cell.
+# Only the first and last position are kept in age order, the cells in between are in no particular order, see `Frontier`.
+Policy = Callable[[int, random.Random], int]
+
+def newest(count:int, rng:random.Random) -> int:
+    """Always grows the most recently added cell, which makes long corridors like a depth first search"""
+    return count - 1
+
+def oldest(count:int, rng:random.Random) -> int:
+    """Always grows the cell that has been in the frontier the longest, which makes a breadth first flood"""
+    return 0
+
+def at_random(count:int, rng:random.Random) -> int:
+    """Grows any cell of the frontier, which makes many short dead ends like Prim's algorithm"""
+    return rng.randrange(count)
+
+def mixed(*weighted:tuple[Policy, float]) -> Policy:
+    """Returns a policy that uses each of the given policies with a chance proportional to its weight"""
+    policies = [policy for policy, _ in weighted]
+    total = sum(weight for _, weight in weighted)
+    thresholds = []
+    running = 0.0
+    for _, weight in weighted:
+        running += weight / total
+        thresholds.append(running)
+    def execute(count:int, rng:random.Random) -> int:
+        roll = rng.random()
+        for policy, threshold in zip(policies, thresholds):
+            if roll < threshold:
+                return policy(count, rng)
+        return policies[-1](count, rng)
+    return execute
+
+POLICIES: dict[str, Policy] = {
+    "newest": newest,
+    "oldest": oldest,
+    "random": at_random,
+}
+
+class Frontier:
+    """The nodes the tree can still grow from, every pick and removal is O(1) whatever the policy.
+
+    The nodes are kept in `nodes` in no particular order, `slots` holds the position of every node in it or -1, and a
+    removed node is swapped with the last one. `order` lists them oldest first, removed nodes are only dropped from it
+    once they reach either end, so the oldest and newest node are found in amortized O(1). Positions follow `Policy`:
+    0 is the oldest node, len - 1 the newest and any other position one of the nodes in between."""
+    __slots__ = ("nodes", "slots", "order")
+
+    def __init__(self, size:int, first:int):
+        self.nodes = [first]
+        self.slots = array('i', [-1]) * size
+        self.slots[first] = 0
+        self.order = deque([first])
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def add(self, node:int):
+        self.slots[node] = len(self.nodes)
+        self.nodes.append(node)
+        self.order.append(node)
+
+    def oldest(self) -> int:
+        order, slots = self.order, self.slots
+        while slots[order[0]] < 0:
+            order.popleft()
+        return order[0]
+
+    def newest(self) -> int:
+        order, slots = self.order, self.slots
+        while slots[order[-1]] < 0:
+            order.pop()
+        return order[-1]
+
+    def at(self, position:int) -> int:
+        """Returns the node at a position counted from the oldest"""
+        nodes, slots, order = self.nodes, self.slots, self.order
+        last = len(nodes) - 1
+        while slots[order[-1]] < 0:
+            order.pop()
+        if position == last:
+            return order[-1]
+        while slots[order[0]] < 0:
+            order.popleft()
+        if position == 0:
+            return order[0]
+        # Seen as if the oldest node was swapped to the front and then the newest to the back,
+        # so the positions in between are every other node once
+        old = slots[order[0]]
+        new = slots[order[-1]]
+        if new == 0:
+            new = old
+        if position == new:
+            position = last
+        if position == 0:
+            return nodes[old]
+        if position == old:
+            return nodes[0]
+        return nodes[position]
+
+    def remove(self, node:int):
+        slot = self.slots[node]
+        last = self.nodes.pop()
+        if last != node:
+            self.nodes[slot] = last
+            self.slots[last] = slot
+        self.slots[node] = -1
+
+def growing_tree(maze:list[list[Cell]], policy:Policy=newest, start:Cell|None=None, show_backtracking:bool=False, animate:bool=True, record:bool=False, events:array|None=None, rng:random.Random|None=None):
+    """ based on the Growing Tree algorithm:\n
+    https://weblog.jamisbuck.org/2011/1/27/maze-generation-growing-tree-algorithm
+        Returns a tuple containing the STARTING cell, ENDING cell, and a generator function for creating the maze based on those cells.
+        The `policy` picks the frontier cell to grow from, with `show_backtracking` removed cells are traversed too.
+    """
+    # It is assumed that a maze with all isolated cells are passed in.
+    rng = default_rng(rng)
+    width = len(maze[0])
+    STARTING_CELL = random_cell(maze, rng) if start is None else start
+    ENDING_CELL = random_cell(maze, rng)
+    traversal = new_traversal(STARTING_CELL, width, animate, record)
+
+    def get_neighbors(cell:Cell):
+        """Returns the dir and cell at unvisited walls"""
+        neighbors: list[tuple[Direction, Cell]] = []
+        for dir, state in cell.walls.items():
+            if state is not State.UNVISITED:
+                continue
+            n = maze[cell.Y+DY[dir]][cell.X+DX[dir]]
+            if not n.visited:
+                neighbors.append((dir, n))
+        return neighbors
+
+    def _generator():
+        frontier = Frontier(len(maze) * width, STARTING_CELL.Y * width + STARTING_CELL.X)
+        if animate:
+            yield maze, traversal
+        while frontier:
+            # 1. Pick a cell of the frontier
+            node = frontier.at(policy(len(frontier), rng))
+            current = maze[node // width][node % width]
+            neighbors = get_neighbors(current)
+            # 2. If it has no unvisited neighbours, remove it from the frontier
+            if len(neighbors) == 0:
+                frontier.remove(node)
+                if show_backtracking:
+                    if animate:
+                        traversal.append(current)
+                        yield maze, traversal
+                    elif record:
+                        traversal.append(current.Y * width + current.X)
+                continue
+            # 3. Otherwise carve into a random unvisited neighbour and add it to the frontier
+            direction, chosen = rng.choice(neighbors)
+            current.visit(chosen, direction)
+            if events is not None:
+                events.append(((current.Y * width + current.X) << 2) | DIRECTION_INDEX[direction])
+            frontier.add(chosen.Y * width + chosen.X)
+            if animate:
+                traversal.append(chosen)
+                yield maze, traversal
+            elif record:
+                traversal.append(chosen.Y * width + chosen.X)
+        if not animate:
+            yield maze, traversal
+
+    def _grid_generator():
+        # The same steps on a MazeGrid, carving the bits of node ids (`y * width + x`) straight into its cells
+        # instead of going through a GridCell for every lookup
+        cells = maze.cells
+        size = len(cells)
+        steps = [DY[d] * width + DX[d] for d in DIRECTIONS]
+        bits = [WALL_BITS[d] for d in DIRECTIONS]
+        inverse_bits = [WALL_BITS[INVERSE[d]] for d in DIRECTIONS]
+        frontier = Frontier(size, STARTING_CELL.Y * width + STARTING_CELL.X)
+        nodes, pick, add, remove = frontier.nodes, frontier.at, frontier.add, frontier.remove
+        if animate:
+            yield maze, traversal
+        while nodes:
+            node = pick(policy(len(nodes), rng))
+            x = node % width
+            # The unvisited neighbours, in the order of DIRECTIONS like `get_neighbors`
+            options = []
+            if x > 0 and not cells[node - 1]:
+                options.append(0)
+            if node >= width and not cells[node - width]:
+                options.append(1)
+            if x < width - 1 and not cells[node + 1]:
+                options.append(2)
+            if node < size - width and not cells[node + width]:
+                options.append(3)
+            if not options:
+                remove(node)
+                if show_backtracking:
+                    if animate:
+                        traversal.append(GridCell(maze, x, node // width))
+                        yield maze, traversal
+                    elif record:
+                        traversal.append(node)
+                continue
+            d = rng.choice(options)
+            chosen = node + steps[d]
+            cells[node] |= bits[d]
+            cells[chosen] |= inverse_bits[d]
+            maze.version += 1
+            if events is not None:
+                events.append((node << 2) | d)
+            add(chosen)
+            if animate:
+                traversal.append(GridCell(maze, chosen % width, chosen // width))
+                yield maze, traversal
+            elif record:
+                traversal.append(chosen)
+        if not animate:
+            yield maze, traversal
+
+    generator = _grid_generator() if isinstance(maze, MazeGrid) else _generator()
+    return STARTING_CELL, ENDING_CELL, generator, maze, traversal
+
+def parse_policy(text:str) -> Policy:
+    """Parses a policy name, or a weighted mix of them such as `newest=3,random=1`"""
+    if "=" not in text:
+        return POLICIES[text]
+    weighted: list[tuple[Policy, float]] = []
+    for part in text.split(","):
+        name, weight = part.split("=")
+        weighted.append((POLICIES[name.strip()], float(weight)))
+    return mixed(*weighted)
+
+def parse_cli_args() :
+    import argparse
+    from sys import argv
+    parser = argparse.ArgumentParser(description='Generate\'s a maze using the Growing Tree algorithm')
+    parser.add_argument('-l', '--length', required=True, type=int, help='The length of the maze to be made')
+    parser.add_argument('-w', '--width',required=True,  type=int, help='The width of the maze to be made')
+    parser.add_argument('-seed', '--seed', type=seed_arg, help='Seed the random number generator, the same seed always makes the same maze')
+    parser.add_argument('-policy', '--policy', type=str, default="newest", help=f'Which cell to grow from: one of {", ".join(POLICIES)}, or a weighted mix such as newest=3,random=1')
+    parser.add_argument('-export', '--export',required=True,  type=str, help=f'Export the created maze to a file as an adjacency list, or in the binary format if it ends with {BINARY_EXTENSION}')
+    parser.add_argument('-log', '--log', type=str, help=f'Also write every carved wall to a generation log ({LOG_EXTENSION}), see carve_events.py')
+    if len(argv) == 1:
+        parser.print_help()
+        exit(0)
+    return parser.parse_args(argv[1:])
+
+def main():
+    '''Run if main module'''
+    args = parse_cli_args()
+    if args.length and args.width:
+        generate_for_cli(lambda **options: growing_tree(make_initial_maze(args.length, args.width), parse_policy(args.policy), **options), args)
+
+if __name__ == '__main__':
+    main()
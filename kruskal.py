@@ -0,0 +1,108 @@
+import random
+from array import array
+import numpy as np
+from Direction import DIRECTION_INDEX, Direction
+from MazeGrid import WALL_BITS, GridCell, MazeGrid
+from carve_events import LOG_EXTENSION
+from maze import BINARY_EXTENSION, default_rng, generate_for_cli, random_cell, seed_arg
+
+def shuffled_walls(length:int, width:int, rng:random.Random) -> list[int]:
+    """Returns every inner wall of a maze in a random order. A wall is numbered after the cell to its west or north:
+    node*2 is its east wall and node*2+1 its south wall. They are numbered and shuffled in NumPy, seeded from `rng`."""
+    size = length * width
+    nodes = np.arange(size, dtype=np.int64)
+    walls = np.concatenate([nodes[nodes % width != width - 1] * 2, nodes[:size - width] * 2 + 1])
+    np.random.default_rng(rng.getrandbits(64)).shuffle(walls)
+    return walls.tolist()
+
+def kruskal(length:int, width:int, animate:bool=True, record:bool=False, events:array|None=None, rng:random.Random|None=None):
+    """ based on Randomized Kruskal's:\n
+    https://en.wikipedia.org/wiki/Maze_generation_algorithm
+        Returns a tuple containing the STARTING cell, ENDING cell, and a generator function for creating the maze based on those cells.
+    """
+    rng = default_rng(rng)
+    maze = MazeGrid(length, width)
+    STARTING_CELL = random_cell(maze, rng)
+    ENDING_CELL = random_cell(maze, rng)
+    # Kruskal's carves all over the maze instead of growing from a cell, so the traversal doesn't start with one
+    traversal: list[GridCell] | array = [] if animate else array('I')
+
+    def _generator():
+        cells = maze.cells
+        size = length * width
+        # 1. Shuffle the walls once, instead of picking random ones later
+        walls = shuffled_walls(length, width, rng)
+        # 2. Every cell starts in its own set
+        parent = array('I', range(size))
+        rank = bytearray(size)
+        EAST, WEST = WALL_BITS[Direction.EAST], WALL_BITS[Direction.WEST]
+        SOUTH, NORTH = WALL_BITS[Direction.SOUTH], WALL_BITS[Direction.NORTH]
+        EAST_INDEX, SOUTH_INDEX = DIRECTION_INDEX[Direction.EAST], DIRECTION_INDEX[Direction.SOUTH]
+
+        if animate:
+            yield maze, traversal
+        for wall in walls:
+            node = wall >> 1
+            other = node + width if wall & 1 else node + 1
+            # 3. Find the sets of the cells divided by the wall, halving the paths along the way
+            a = node
+            up = parent[a]
+            while up != a:
+                parent[a] = a = parent[up]
+                up = parent[a]
+            b = other
+            up = parent[b]
+            while up != b:
+                parent[b] = b = parent[up]
+                up = parent[b]
+            if a == b:
+                continue
+            # 3.1 If they are in different sets, join them, hanging the shorter tree under the taller one...
+            if rank[a] < rank[b]:
+                a, b = b, a
+            parent[b] = a
+            if rank[a] == rank[b]:
+                rank[a] += 1
+            # 3.2 and remove the wall between them
+            if wall & 1:
+                cells[node] |= SOUTH
+                cells[other] |= NORTH
+            else:
+                cells[node] |= EAST
+                cells[other] |= WEST
+            if events is not None:
+                events.append((node << 2) | (SOUTH_INDEX if wall & 1 else EAST_INDEX))
+            if animate:
+                traversal.append(GridCell(maze, other % width, other // width))
+                maze.version += 1
+                yield maze, traversal
+            elif record:
+                traversal.append(other)
+        if not animate:
+            maze.version += 1
+            yield maze, traversal
+
+    return STARTING_CELL, ENDING_CELL, _generator(), maze, traversal
+
+def parse_cli_args() :
+    import argparse
+    from sys import argv
+    parser = argparse.ArgumentParser(description='Generate\'s a maze using Randomized Kruskal\'s algorithm')
+    parser.add_argument('-l', '--length', required=True, type=int, help='The length of the maze to be made')
+    parser.add_argument('-w', '--width',required=True,  type=int, help='The width of the maze to be made')
+    parser.add_argument('-seed', '--seed', type=seed_arg, help='Seed the random number generator, the same seed always makes the same maze')
+    parser.add_argument('-export', '--export',required=True,  type=str, help=f'Export the created maze to a file as an adjacency list, or in the binary format if it ends with {BINARY_EXTENSION}')
+    parser.add_argument('-log', '--log', type=str, help=f'Also write every carved wall to a generation log ({LOG_EXTENSION}), see carve_events.py')
+    if len(argv) == 1:
+        parser.print_help()
+        exit(0)
+    return parser.parse_args(argv[1:])
+
+def main():
+    '''Run if main module'''
+    args = parse_cli_args()
+    if args.length and args.width:
+        generate_for_cli(lambda **options: kruskal(length=args.length, width=args.width, **options), args)
+
+if __name__ == '__main__':
+    main()
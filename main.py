@@ -6,8 +6,9 @@ from Fonts import Fonts
 from GeneratorScreen import GeneratorScreen
 from SolverScreen import SolverScreen
 from render_maze import tile_position
+from Viewport import Viewport
 from widgets import Button, Button, Text, TextField
-from maze import as_matrix, export_file, import_maze_details, matrix_to_str_edgelist
+from maze import BINARY_EXTENSION, as_matrix, import_maze_details, save_maze
 
 def onFPSChange(val:str):
     if val.isdigit():
@@ -44,6 +45,8 @@ def main():
         'unsectioned': load_image("assets/paths/unsectioned.png", SIZE,SIZE) #15   
     }
     reposition_img = tile_position(SIZE)
+    # The maze is drawn in the tiles left of and above the UI
+    viewport = Viewport(SIZE, pygame.Rect(0, 0, width*SIZE, length*SIZE))
 
     FPS_LABEL = Fonts.textFont.render('FPS:', True, Colors.WHITE, Colors.BLACK)
     FPS_LABEL_RECT = FPS_LABEL.get_rect()
@@ -60,29 +63,28 @@ def main():
     
     def prompt_file_path():
         from tkinter import filedialog, messagebox
-        filepath = filedialog.asksaveasfilename(defaultextension="json", filetypes=[("JSON", "*.json")], title="Save maze as JSON")
+        filepath = filedialog.asksaveasfilename(defaultextension="json", filetypes=[("JSON", "*.json"), ("Binary maze", f"*{BINARY_EXTENSION}")], title="Save maze")
         if filepath and GENERATOR_SCREEN.start_cell and GENERATOR_SCREEN.ending_cell:
-            export_file(
-                matrix_to_str_edgelist(GENERATOR_SCREEN.maze), 
+            save_maze(
+                GENERATOR_SCREEN.maze, 
                 (GENERATOR_SCREEN.start_cell,GENERATOR_SCREEN.ending_cell), 
-                filepath 
+                filepath,
+                seed=GENERATOR_SCREEN.maze_seed
             )
             messagebox.showinfo("Success", "Maze saved successfully")
     def load_file_path():
         from tkinter import filedialog, messagebox
-        filepath = filedialog.askopenfilename(filetypes=[("JSON", "*.json")], title="Load maze from JSON")
+        filepath = filedialog.askopenfilename(filetypes=[("JSON", "*.json"), ("Binary maze", f"*{BINARY_EXTENSION}")], title="Load maze")
         if not filepath:
             return
         try:
             maze_details = import_maze_details(filepath)
+            # Mazes of any size can be loaded, the viewport scrolls and zooms over the ones bigger than the window
             maze = as_matrix(maze_details["graph"])
-            # check the dimensions of this maze is the same with the constants. Otherwise show an error for now
-            if len(maze) != length or len(maze[0]) != width:
-                messagebox.showerror("Error", f"Failed to load maze!\n Maze dimensions must be {width} by {length}.\n Got {len(maze[0])} by {len(maze)} ")
-                return
             GENERATOR_SCREEN.maze = maze
             GENERATOR_SCREEN.start_cell = maze_details["start"]
             GENERATOR_SCREEN.ending_cell = maze_details["end"]
+            GENERATOR_SCREEN.maze_seed = None
             GENERATOR_SCREEN.end()
             if SOLVER_SCREEN._running:
                 SOLVER_SCREEN.search(
@@ -127,6 +129,7 @@ def main():
         FPS_FIELD,
         FPS_LABEL,
         FPS_LABEL_RECT,
+        viewport,
     )
     GENERATOR_SCREEN.start()
     SOLVER_SCREEN = SolverScreen(
@@ -140,11 +143,13 @@ def main():
         FPS_FIELD,
         FPS_LABEL,
         FPS_LABEL_RECT,
+        viewport,
     )
 
     # Start the game loop 
     while True:
-        GENERATOR_SCREEN.start()
+        # Coming back from the solver starts on a new maze
+        GENERATOR_SCREEN.restart()
         GENERATOR_SCREEN.loop()
         SOLVER_SCREEN.MAZE = GENERATOR_SCREEN.maze
         SOLVER_SCREEN._running = True
@@ -1,7 +1,10 @@
-from random import randint
-from typing import Callable, TypeVar
+from array import array
+import random
+import struct
+from typing import Callable, Iterable, TypeVar, cast
 from Cell import Cell
-from Direction import DIRECTIONS, Direction
+from Direction import DIRECTIONS, DX, DY, FROM_DELTA, Direction
+from MazeGrid import MazeGrid
 from State import State
 
 def init_cells(length: int, width: int):
@@ -53,22 +56,62 @@ def make_initial_maze(length: int, width: int):
     """
     return [[block_edges(Cell(x, y), length=length, width=width) for x in range(width)] for y in range(length)]
 
-def random_cell(maze:list[list[Cell]]) -> Cell:
+def default_rng(rng:random.Random|None) -> random.Random:
+    """Returns the random number generator given to a generator, or the global one of the random module when there is none"""
+    return cast(random.Random, random) if rng is None else rng
+
+def random_cell(maze:list[list[Cell]], rng:random.Random|None=None) -> Cell:
     """
     Selects a random cell from the given maze.
 
     Parameters:
     maze (list[list[Cell]]): The maze represented as a 2D list of cells.
+    rng (random.Random): The random number generator to use, the global one of the random module by default.
 
     Returns:
     Cell: The randomly selected cell.
     """
+    rng = default_rng(rng)
     width = len(maze[0])
     length = len(maze)
-    X = randint(0, width-1)
-    Y = randint(0, length-1)
+    X = rng.randint(0, width-1)
+    Y = rng.randint(0, length-1)
     return maze[Y][X]
 
+def new_traversal(start:Cell, width:int, animate:bool, record:bool):
+    """Returns the traversal a generator starts with. Animated generators list the cells they visit for the GUI,
+    otherwise the node ids (`y * width + x`) are packed in an array, and only when `record` is set."""
+    if animate:
+        return [start]
+    return array('I', [start.Y * width + start.X] if record else [])
+
+def run_to_completion(generated:tuple):
+    """Runs a generator made with `animate=False` and returns its (start, end, maze, traversal).
+    Such generators carve the whole maze before they yield, so this resumes them only once.
+    Every generator takes the same options:
+        animate: yield after every carved wall for the GUI, False carves the whole maze without suspending.
+        record: keep the traversal as node ids even when not animating, see `new_traversal`.
+        events: an array every carved wall is appended to, see `carve_events`.
+        rng: the random.Random to use, a seeded one makes the same maze again."""
+    start, end, generator, maze, traversal = generated
+    for _ in generator:
+        pass
+    return start, end, maze, traversal
+
+def generate_for_cli(generate:Callable[..., tuple], args) -> tuple[Cell, Cell, list[list[Cell]]]:
+    """Runs a generator for the `main` of its module, then saves the maze to `args.export` and its generation log to
+    `args.log` when they are given. `generate` is called with the `animate`, `record`, `events` and `rng` arguments"""
+    from carve_events import new_events, write_log
+    events = new_events() if args.log else None
+    # Only the adjacency list keeps the traversal, so only record it for that
+    record = bool(args.export) and not args.export.endswith(BINARY_EXTENSION)
+    start, end, maze, traversal = run_to_completion(generate(animate=False, record=record, events=events, rng=random.Random(args.seed)))
+    if args.export:
+        save_maze(maze, (start, end), args.export, traversal, seed=args.seed)
+    if args.log:
+        write_log(events, len(maze), len(maze[0]), (start, end), args.log)
+    return start, end, maze
+
 
 T = TypeVar("T")
 EdgeList = dict[T, list[T]]
@@ -81,6 +124,9 @@ def as_matrix(edgelist: EdgeList[Cell]):
     Returns:
         list[list[Cell]]: The matrix representation of the maze
     """
+    # Grids loaded from a binary file are already indexed by coordinates
+    if isinstance(edgelist, MazeGrid):
+        return edgelist
     # Get the length and width of the maze
     length = max([cell.Y for cell in edgelist.keys()]) + 1
     width = max([cell.X for cell in edgelist.keys()]) + 1
@@ -92,8 +138,7 @@ def as_matrix(edgelist: EdgeList[Cell]):
         cell.walls = {direction:State.UNVISITED for direction in DIRECTIONS}
         for neighbor in neighbors:
             # Get the direction of the neighbor
-            direction = Direction((neighbor.X - cell.X, neighbor.Y - cell.Y))
-            cell.walls[direction] = State.VISITED
+            cell.open_wall(FROM_DELTA[(neighbor.X - cell.X, neighbor.Y - cell.Y)])
         block_edges(cell, length, width)
 
     return matrix
@@ -107,7 +152,7 @@ def curried_matrix_to_edgelist(converter:Callable[[Cell], T]) -> Callable[[list[
             for x in range(WIDTH):
                 cell = maze[y][x]
                 converted = converter(cell)
-                graph[converted] = [converter(maze[y+d.value[1]][x+d.value[0]]) for d in cell.visited_walls()]
+                graph[converted] = [converter(maze[y+DY[d]][x+DX[d]]) for d in cell.visited_walls()]
 
         return graph
     return execute
@@ -164,7 +209,90 @@ def import_file(path:str):
     with open(path, 'r') as f:
         return json.load(f)
 
+# Binary maze file:
+#   header: magic, version, flags, width, length, start x, start y, end x, end y, seed
+#   body:   one byte per cell in row-major order, laid out like MazeGrid.cells
+BINARY_EXTENSION = ".maze"
+BINARY_MAGIC = b"MAZE"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct("<4sHHIIIIIIq")
+# Set in the flags when the seed in the header is meaningful
+FLAG_SEEDED = 1
+# The seeds the header can hold, it is a signed 64 bit int
+SEED_RANGE = range(-2**63, 2**63)
+
+def seed_arg(text:str) -> int:
+    """Parses a -seed argument, only taking seeds that fit in the header of the binary format"""
+    import argparse
+    seed = int(text)
+    if seed not in SEED_RANGE:
+        raise argparse.ArgumentTypeError(f"the seed must be between {SEED_RANGE.start} and {SEED_RANGE.stop - 1}")
+    return seed
+
+def export_binary(maze:list[list[Cell]], startEnd:tuple[Cell,Cell], filepath:str, seed:int|None=None):
+    """Writes a maze (a matrix of Cells or a MazeGrid) to the binary maze format"""
+    grid = maze if isinstance(maze, MazeGrid) else MazeGrid.from_matrix(maze)
+    export_binary_rows([grid.cells], grid.length, grid.width, startEnd, filepath, seed)
+
+def export_binary_rows(rows:Iterable[bytes], length:int, width:int, startEnd:tuple[Cell,Cell], filepath:str, seed:int|None=None):
+    """Writes a maze to the binary maze format as its rows of wall bits arrive, without holding the whole maze in memory"""
+    start, end = startEnd
+    with open(filepath, 'wb') as f:
+        f.write(BINARY_HEADER.pack(
+            BINARY_MAGIC,
+            BINARY_VERSION,
+            FLAG_SEEDED if seed is not None else 0,
+            width, length,
+            start.X, start.Y,
+            end.X, end.Y,
+            seed if seed is not None else 0,
+        ))
+        for row in rows:
+            f.write(row)
+
+def is_binary_file(path:str) -> bool:
+    with open(path, 'rb') as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+def import_binary(path:str, graphKey="graph"):
+    """Opens a binary maze file without reading it. The returned grid is a read-only view of the memory-mapped file,
+    so cells are only loaded from disk once they are accessed."""
+    import mmap
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, flags, width, length, start_x, start_y, end_x, end_y, seed = BINARY_HEADER.unpack_from(buffer)
+    if magic != BINARY_MAGIC:
+        raise ValueError(f"{path} is not a binary maze file")
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported binary maze version {version}, expected {BINARY_VERSION}")
+    # The memoryview keeps the mapping open for as long as the grid is alive
+    cells = memoryview(buffer)[BINARY_HEADER.size:BINARY_HEADER.size + width * length]
+    grid = MazeGrid(length, width, cells)
+    return {
+        graphKey: grid,
+        "start": grid[start_y][start_x],
+        "end": grid[end_y][end_x],
+        "seed": seed if flags & FLAG_SEEDED else None,
+    }
+
+def save_maze(maze:list[list[Cell]], startEnd:tuple[Cell,Cell], filepath:str, traversal=None, seed:int|None=None):
+    """Exports a maze in the binary format if the path ends with BINARY_EXTENSION, otherwise as a JSON adjacency list.
+    Only the binary format keeps the seed the maze was generated with, only the adjacency list keeps the traversal.
+    A recorded traversal of node ids (`y * width + x`) is written as coordinates, like one of cells."""
+    if filepath.endswith(BINARY_EXTENSION):
+        export_binary(maze, startEnd, filepath, seed)
+    else:
+        if isinstance(traversal, array):
+            width = len(maze[0])
+            traversal = [f"({node % width},{node // width})" for node in traversal]
+        export_file(matrix_to_str_edgelist(maze), startEnd, filepath, traversal)
+
 def import_maze_details(path:str, graphKey="graph"):
+    """Reads a maze file. For binary files the graph is a MazeGrid instead of an adjacency list, `as_matrix` accepts either."""
+    if is_binary_file(path):
+        details = import_binary(path, graphKey)
+        del details["seed"]
+        return details
     raw = import_file(path)
     maze: dict[str, list[str]] = raw[graphKey]
     start = raw['start']
@@ -188,8 +316,8 @@ def import_maze_details(path:str, graphKey="graph"):
 def parse_cli_args() :
     import argparse
     from sys import argv
-    parser = argparse.ArgumentParser(description='Prints the maze from a json file')
-    parser.add_argument('-f', '--file', type=str, required=True, help='reads a json file containing a maze')
+    parser = argparse.ArgumentParser(description='Prints the maze from a json or binary maze file')
+    parser.add_argument('-f', '--file', type=str, required=True, help=f'reads a json or binary ({BINARY_EXTENSION}) file containing a maze')
     if len(argv) == 1:
         parser.print_help()
         exit(0)
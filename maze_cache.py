@@ -0,0 +1,90 @@
+import hashlib
+import random
+from collections import OrderedDict
+from typing import Callable
+from binary_tree import binary_tree
+from Cell import Cell
+from kruskal import kruskal
+from MazeGrid import GridCell, MazeGrid
+from maze import BINARY_EXTENSION, run_to_completion, save_maze, seed_arg
+from prim import prim
+from random_dfs import random_dfs
+from sidewinder import sidewinder
+from stackless_dfs import stackless_dfs
+from wilson import wilson
+
+# Every generator that can be seeded, run without animation on a MazeGrid
+GENERATORS: dict[str, Callable[[int, int, random.Random], tuple]] = {
+    "random_dfs": lambda length, width, rng: random_dfs(length, width, MazeGrid, animate=False, rng=rng),
+    "prim": lambda length, width, rng: prim(MazeGrid(length, width), animate=False, rng=rng),
+    "kruskal": lambda length, width, rng: kruskal(length, width, animate=False, rng=rng),
+    "wilson": lambda length, width, rng: wilson(length, width, animate=False, rng=rng),
+    "stackless_dfs": lambda length, width, rng: stackless_dfs(length, width, animate=False, rng=rng),
+    "binary_tree": lambda length, width, rng: binary_tree(length, width, animate=False, rng=rng),
+    "sidewinder": lambda length, width, rng: sidewinder(length, width, animate=False, rng=rng),
+}
+
+# The packed form of the most recently requested mazes: their cells as bytes, and the coordinates of their start and end
+PackedMaze = tuple[bytes, tuple[int, int], tuple[int, int]]
+_cache: "OrderedDict[tuple[str, int, int, int], PackedMaze]" = OrderedDict()
+CACHE_SIZE = 32
+
+def maze_seed(base_seed:int, number:int) -> int:
+    """Returns the seed of the maze numbered `number` of a batch, or of a tile of a tiled maze. It only depends on the number,
+    not on the worker that makes it, so the output is the same however many workers it runs on. Any base seed works,
+    the result is hashed down to 63 bits so it always fits in the header of the binary format."""
+    digest = hashlib.blake2b(f"{base_seed}:{number}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") & (2**63 - 1)
+
+def _remember(key:tuple[str, int, int, int], packed:PackedMaze):
+    _cache[key] = packed
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+def packed_maze(algorithm:str, length:int, width:int, seed:int) -> PackedMaze:
+    """Returns the packed form of the maze a seeded generator makes, only generating it when it isn't cached"""
+    key = (algorithm, width, length, seed)
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    start, end, maze, _ = run_to_completion(GENERATORS[algorithm](length, width, random.Random(seed)))
+    _remember(key, (bytes(maze.cells), start.coordinate, end.coordinate))
+    return _cache[key]
+
+def is_cached(algorithm:str, length:int, width:int, seed:int) -> bool:
+    return (algorithm, width, length, seed) in _cache
+
+def remember_maze(algorithm:str, length:int, width:int, seed:int, start:Cell, end:Cell, maze:list[list[Cell]]):
+    """Caches a maze a seeded generator made elsewhere, like in an animation, a MazeGrid or a matrix of Cells"""
+    grid = maze if isinstance(maze, MazeGrid) else MazeGrid.from_matrix(maze)
+    _remember((algorithm, width, length, seed), (bytes(grid.cells), start.coordinate, end.coordinate))
+
+def generate_maze(algorithm:str, length:int, width:int, seed:int) -> tuple[GridCell, GridCell, MazeGrid]:
+    """Returns the STARTING cell, ENDING cell and maze a seeded generator makes.
+    The maze is a fresh copy, carving it doesn't change the cached one."""
+    cells, (start_x, start_y), (end_x, end_y) = packed_maze(algorithm, length, width, seed)
+    maze = MazeGrid(length, width, bytearray(cells))
+    return maze[start_y][start_x], maze[end_y][end_x], maze
+
+def parse_cli_args() :
+    import argparse
+    from sys import argv
+    parser = argparse.ArgumentParser(description='Generate\'s the maze a seeded generator makes')
+    parser.add_argument('-a', '--algorithm', required=True, choices=list(GENERATORS), help='The generator to use')
+    parser.add_argument('-l', '--length', required=True, type=int, help='The length of the maze to be made')
+    parser.add_argument('-w', '--width',required=True,  type=int, help='The width of the maze to be made')
+    parser.add_argument('-seed', '--seed', required=True, type=seed_arg, help='The seed of the random number generator')
+    parser.add_argument('-export', '--export',required=True,  type=str, help=f'Export the created maze to a file as an adjacency list, or in the binary format if it ends with {BINARY_EXTENSION}')
+    if len(argv) == 1:
+        parser.print_help()
+        exit(0)
+    return parser.parse_args(argv[1:])
+
+def main():
+    '''Run if main module'''
+    args = parse_cli_args()
+    start, end, maze = generate_maze(args.algorithm, args.length, args.width, args.seed)
+    save_maze(maze, (start, end), args.export, seed=args.seed)
+
+if __name__ == '__main__':
+    main()
@@ -1,55 +1,25 @@
 import random
+from array import array
+from typing import Callable
 from Cell import Cell
-from Direction import Direction
-from maze import matrix_to_str_edgelist, export_file, make_initial_maze, random_cell
+from carve_events import LOG_EXTENSION
+from growing_tree import growing_tree, newest
+from maze import BINARY_EXTENSION, generate_for_cli, make_initial_maze, seed_arg
 
-def random_dfs(length:int, width:int):
-    """ Returns a tuple containing the STARTING cell, ENDING cell, and a generator function for creating the maze based on those cells"""
-    maze:list[list[Cell]] = make_initial_maze(length, width)
-    # (1) Choose the initial cell, mark it as visited and push it to the stack
-    STARTING_CELL = random_cell(maze)
-    ENDING_CELL = random_cell(maze)
+def random_dfs(length:int, width:int, make_maze:Callable[[int,int], list[list[Cell]]]=make_initial_maze, animate:bool=True, record:bool=False, events:array|None=None, rng:random.Random|None=None):
+    """ Returns a tuple containing the STARTING cell, ENDING cell, and a generator function for creating the maze based on those cells.
+        Pass `MazeGrid` as `make_maze` to carve into a packed grid"""
+    return growing_tree(make_maze(length, width), newest, show_backtracking=True, animate=animate, record=record, events=events, rng=rng)
 
-    def get_neighbors(cell:Cell):
-        """Returns the dir and cell at unvisited walls"""
-        # Get the cell at the given direction
-        neighbors = {dir:maze[cell.Y+dir.value[1]][cell.X+dir.value[0]] for dir in cell.unvisited_walls()}
-        return [(dir,n) for dir,n in neighbors.items() if not n.visited]
-    path:list[Cell] = [STARTING_CELL]
-    def _generator():
-        stack = [STARTING_CELL]
-        # The path represents the entire graph traversal.
-
-        # Yield the initial maze
-        yield maze,path
-        while len(stack) > 0:
-            current: Cell = stack.pop()
-            # (2) If the chosen cell has any unvisited neighbours
-            neighbors: list[tuple[Direction, Cell]] = get_neighbors(current)
-            if len(neighbors) == 0:
-                path.append(current)
-                yield maze, path
-                continue
-            # (2.1) Choose one of the unvisited neighbours
-            direction, chosen = random.choice(neighbors)
-            # (2.2) Mark the chosen cell as visited
-            current.visit(chosen, direction)
-            # (2.3) Put back current
-            stack.append(current)
-            # (2.4) push chosen to the stack, 
-            # since we want to visit it next, since it is dfs
-            stack.append(chosen)
-            path.append(chosen)
-            yield maze, path
-
-    return STARTING_CELL, ENDING_CELL, _generator(), maze, path
 def parse_cli_args() :
     import argparse
     from sys import argv
     parser = argparse.ArgumentParser(description='Generate\'s a maze using Random Depth First Search')
     parser.add_argument('-l', '--length', required=True, type=int, help='The length of the maze to be made')
     parser.add_argument('-w', '--width',required=True,  type=int, help='The width of the maze to be made')
-    parser.add_argument('-export', '--export',required=True,  type=str, help='Export the created maze to a file as an adjacency list')
+    parser.add_argument('-seed', '--seed', type=seed_arg, help='Seed the random number generator, the same seed always makes the same maze')
+    parser.add_argument('-export', '--export',required=True,  type=str, help=f'Export the created maze to a file as an adjacency list, or in the binary format if it ends with {BINARY_EXTENSION}')
+    parser.add_argument('-log', '--log', type=str, help=f'Also write every carved wall to a generation log ({LOG_EXTENSION}), see carve_events.py')
     if len(argv) == 1:
         parser.print_help()
         exit(0)
@@ -58,13 +28,7 @@ def parse_cli_args() :
 def main():
     args = parse_cli_args()
     if args.length and args.width:
-        (STARTING_CELL, ENDING_CELL, maze_generator, maze, traversal) = random_dfs(length=args.length,width=args.width)
-        # Consume the entire generator
-        for _, _ in maze_generator:
-            pass
-        if args.export:
-            maze_details = matrix_to_str_edgelist(maze)
-            export_file(maze_details, (STARTING_CELL, ENDING_CELL), args.export,traversal)
+        generate_for_cli(lambda **options: random_dfs(length=args.length, width=args.width, **options), args)
 
 if __name__ == '__main__':
     main()
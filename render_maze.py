@@ -1,6 +1,12 @@
+from array import array
+from carve_events import touched_cells
 from Cell import Cell
+from Colors import Colors
+from MazeGrid import WALL_BITS, GridCell, MazeGrid
+from State import State
+import numpy as np
 import pygame
-from typing import Callable
+from Viewport import Viewport
 
 def tile_position(SIZE:int):
     def reposition(x:int|float,y:int|float,x_pad=0,y_pad=0):
@@ -9,51 +15,244 @@ def tile_position(SIZE:int):
         return (X_START, Y_START)
     return reposition
 
-def render_maze(
-    maze:list[list[Cell]],
-    width:int, length:int,
-    screen:pygame.Surface,
-    paths:dict[str,pygame.Surface],
-    reposition_img:Callable[[int,int],tuple[int,int]],
-    overlay: Callable[[Cell, tuple[int,int]], None]
-):
-    for y in range(length):
-        for x in range(width):
-            cell = maze[y][x]
-            position = reposition_img(x,y)
-            direction_str = "".join([str(d) for d in cell.visited_walls()])
-
-            match direction_str:
-                case '':
-                    screen.blit(paths['unsectioned'], position)
-                case 'NS':
-                    screen.blit(paths['VERTICAL'], position)
-                case 'WE':
-                    screen.blit(paths['HORIZONTAL'], position)
-                case 'WNS':
-                    screen.blit(paths['V_west'], position)
-                case 'NES':
-                    screen.blit(paths['V_east'], position)
-                case 'WES':
-                    screen.blit(paths['H_south'], position)
-                case 'WNE':
-                    screen.blit(paths['H_north'], position)
-                case 'WS':
-                    screen.blit(paths['SOUTHWEST'], position)
-                case 'ES':
-                    screen.blit(paths['SOUTHEAST'], position)
-                case 'WN':
-                    screen.blit(paths['NORTHWEST'], position)
-                case 'NE':
-                    screen.blit(paths['NORTHEAST'], position)
-                case 'E':
-                    screen.blit(paths['westOOB'], position)
-                case 'W':
-                    screen.blit(paths['eastOOB'], position)
-                case 'S':
-                    screen.blit(paths['northOOB'], position)
-                case 'N':
-                    screen.blit(paths['southOOB'], position)
-                case _:
-                    screen.blit(paths['INTERSECTION'], position)
-            overlay(cell, position)
+# The sprite of every cell, indexed by the bits of its carved walls (W=1, N=2, E=4, S=8, see MazeGrid.WALL_BITS)
+SPRITE_KEYS = [
+    'unsectioned',  # none
+    'eastOOB',      # W
+    'southOOB',     # N
+    'NORTHWEST',    # WN
+    'westOOB',      # E
+    'HORIZONTAL',   # WE
+    'NORTHEAST',    # NE
+    'H_north',      # WNE
+    'northOOB',     # S
+    'SOUTHWEST',    # WS
+    'VERTICAL',     # NS
+    'V_west',       # WNS
+    'SOUTHEAST',    # ES
+    'H_south',      # WES
+    'V_east',       # NES
+    'INTERSECTION', # WNES
+]
+
+def sprite_table(paths:dict[str,pygame.Surface]) -> list[pygame.Surface]:
+    """Returns the sprites of `paths` in the order of SPRITE_KEYS, so a wall mask picks its sprite.
+    They are converted to the pixel format of the display when there is one, which makes blitting them much faster."""
+    if pygame.display.get_surface() is None:
+        return [paths[key] for key in SPRITE_KEYS]
+    return [paths[key].convert_alpha() for key in SPRITE_KEYS]
+
+def wall_mask(cell:Cell|GridCell) -> int:
+    """Returns the bits of the carved walls of a cell"""
+    if isinstance(cell, GridCell):
+        return cell.grid.passages(cell.X, cell.Y)
+    return sum(WALL_BITS[d] for d, state in cell.walls.items() if state == State.VISITED)
+
+# Below this tile size the sprites can't be made out, so the maze is drawn as a block of pixels a cell
+PIXEL_TILE = 6
+EAST, SOUTH = 4, 8
+
+def visible_masks(maze:list[list[Cell]], columns:range, rows:range) -> np.ndarray:
+    """Returns the wall masks of the cells in a block of a maze as a (rows, columns) array"""
+    if isinstance(maze, MazeGrid):
+        grid = np.frombuffer(maze.cells, dtype=np.uint8).reshape(maze.length, maze.width)
+        return grid[rows.start:rows.stop, columns.start:columns.stop]
+    return np.array(
+        [[wall_mask(cell) for cell in maze[y][columns.start:columns.stop]] for y in rows],
+        dtype=np.uint8,
+    ).reshape(len(rows), len(columns))
+
+def cells_per_pixel(tile:int|float) -> int:
+    return round(1 / tile)
+
+def pool(cells:np.ndarray, tile:int|float, fill) -> np.ndarray:
+    """Groups the (rows, columns) values of the cells under every pixel when tiles are smaller than a pixel,
+    returns a (pixel rows, pixel columns, cells per pixel ** 2) array. Cells past the edge of the maze are `fill`"""
+    n = cells_per_pixel(tile)
+    rows, columns = cells.shape
+    padded = np.full((-(-rows // n) * n, -(-columns // n) * n), fill, dtype=cells.dtype)
+    padded[:rows, :columns] = cells
+    pixel_rows, pixel_columns = padded.shape[0] // n, padded.shape[1] // n
+    return padded.reshape(pixel_rows, n, pixel_columns, n).transpose(0, 2, 1, 3).reshape(pixel_rows, pixel_columns, n * n)
+
+def maze_pixels(masks:np.ndarray, tile:int|float) -> np.ndarray:
+    """Draws the walls of a (rows, columns) block of wall masks, returns its pixels in the (x, y, rgb) order of surfarray.
+    A cell of `tile` pixels is floor with a line of wall along its east and south sides, where they aren't carved.
+    Smaller than 2 pixels there is no room for that, every pixel is shaded by how many walls of its cells are closed."""
+    floor, wall = np.array(Colors.BOARDWALK, dtype=np.float32), np.array(Colors.GRASS, dtype=np.float32)
+    if tile >= 2:
+        k = int(tile)
+        rows, columns = masks.shape
+        walls = np.zeros((rows, k, columns, k), dtype=bool)
+        walls[:, :, :, k - 1] = (masks & EAST == 0)[:, None, :]
+        walls[:, k - 1, :, :] |= (masks & SOUTH == 0)[:, :, None]
+        walls[:, k - 1, :, k - 1] = True
+        walls = walls.reshape(rows * k, columns * k)
+        closed = walls.astype(np.float32)
+    else:
+        # The share of the east and south walls of the cells under a pixel that are standing
+        standing = (masks & EAST == 0).astype(np.uint8) + (masks & SOUTH == 0)
+        closed = pool(standing, tile, 0).mean(axis=2, dtype=np.float32) / 2
+    pixels = floor + (wall - floor) * closed[..., None]
+    return pixels.astype(np.uint8).transpose(1, 0, 2)
+
+def cell_pixels(marked:np.ndarray, tile:int|float) -> np.ndarray:
+    """Returns which pixels belong to the floor of the marked cells of a (rows, columns) block, in (x, y) order.
+    Smaller than a pixel, a pixel is marked when any of its cells is"""
+    if tile >= 2:
+        k = int(tile)
+        rows, columns = marked.shape
+        floors = np.zeros((rows, k, columns, k), dtype=bool)
+        floors[:, :k - 1, :, :k - 1] = marked[:, None, :, None]
+        return floors.reshape(rows * k, columns * k).T
+    if tile >= 1:
+        return marked.T
+    return pool(marked, tile, False).any(axis=2).T
+
+class MarkedCells:
+    """The floors of some cells of a maze painted a block of pixels each, for views zoomed out below PIXEL_TILE.
+    The cells in the view are painted onto a surface when the view moves, marking a cell after that only fills in its
+    own pixels, so a trail growing a cell a frame costs the same however much of the maze is in the view."""
+    def __init__(self, color:tuple[int,int,int]):
+        self.color = color
+        # The marked cells, a (length, width) array
+        self.cells = np.zeros((0, 0), dtype=bool)
+        self.surface:pygame.Surface|None = None
+        # The view the surface was painted for, the cell at its top left corner, and where it goes on the screen
+        self.drawn_state:tuple|None = None
+        self.origin = (0, 0)
+        self.position = (0, 0)
+
+    def reset(self, cells:np.ndarray):
+        """Replaces the marked cells"""
+        self.cells = cells
+        self.drawn_state = None
+
+    def mark(self, x:int, y:int):
+        if self.cells[y, x]:
+            return
+        self.cells[y, x] = True
+        if self.surface is not None and self.drawn_state is not None:
+            self.surface.fill(self.color, self.pixel_rect(x - self.origin[0], y - self.origin[1], self.drawn_state[0]))
+
+    @staticmethod
+    def pixel_rect(column:int, row:int, tile:int|float) -> pygame.Rect:
+        """Returns the pixels `cell_pixels` gives the floor of a cell, by its position in the painted block"""
+        if tile >= 2:
+            k = int(tile)
+            return pygame.Rect(column * k, row * k, k - 1, k - 1)
+        if tile >= 1:
+            return pygame.Rect(column, row, 1, 1)
+        n = cells_per_pixel(tile)
+        return pygame.Rect(column // n, row // n, 1, 1)
+
+    def paint(self, viewport:Viewport):
+        columns, rows = viewport.visible()
+        self.drawn_state = viewport.state
+        self.origin = (columns.start, rows.start)
+        self.position = viewport.to_screen(columns.start, rows.start)
+        pixels = cell_pixels(self.cells[rows.start:rows.stop, columns.start:columns.stop], viewport.tile)
+        if pixels.size == 0:
+            self.surface = None
+            return
+        # Black is see through, anything not marked is left as it is
+        rgb = np.zeros(pixels.shape + (3,), dtype=np.uint8)
+        rgb[pixels] = self.color
+        self.surface = pygame.surfarray.make_surface(rgb)
+        self.surface.set_colorkey(Colors.BLACK)
+
+    def render(self, screen:pygame.Surface, viewport:Viewport):
+        if self.drawn_state != viewport.state:
+            self.paint(viewport)
+        if self.surface is not None:
+            screen.blit(self.surface, self.position)
+
+class MazeLayer:
+    """An off-screen surface holding the drawn tiles of the part of a maze in a viewport.
+    The visible tiles are all drawn when a maze is attached or the view moves, otherwise only the cells whose walls
+    were carved are redrawn, so keeping the layer up to date costs the same however big the maze is."""
+    def __init__(self, paths:dict[str,pygame.Surface], viewport:Viewport):
+        self.viewport = viewport
+        self.tiles = sprite_table(paths)
+        # The sprite table scaled to every tile size it was drawn at
+        self.scaled_tiles:dict[int, list[pygame.Surface]] = {viewport.SIZE: self.tiles}
+        self.surface = pygame.Surface(viewport.rect.size)
+        if pygame.display.get_surface() is not None:
+            self.surface = self.surface.convert()
+        self.maze:list[list[Cell]]|None = None
+        self.events:array|None = None
+        self.applied = 0
+        self.drawn_state:tuple|None = None
+
+    def attach(self, maze:list[list[Cell]], events:array|None=None):
+        """Shows a new maze. `events` is the stream its generator carves into, see `carve_events`"""
+        self.maze = maze
+        self.events = events
+        self.applied = len(events) if events is not None else 0
+        if (len(maze[0]), len(maze)) != (self.viewport.width, self.viewport.length):
+            self.viewport.set_maze(len(maze[0]), len(maze))
+        self.drawn_state = None
+
+    def table(self) -> list[pygame.Surface]:
+        tile = self.viewport.tile
+        if tile not in self.scaled_tiles:
+            self.scaled_tiles[tile] = [pygame.transform.scale(sprite, (tile, tile)) for sprite in self.tiles]
+        return self.scaled_tiles[tile]
+
+    def draw_visible(self):
+        """Draws every tile in the view, or every pixel when the tiles are too small for the sprites"""
+        maze, viewport = self.maze, self.viewport
+        assert maze is not None
+        columns, rows = viewport.visible()
+        self.surface.fill((0, 0, 0))
+        self.drawn_state = viewport.state
+        if viewport.tile < PIXEL_TILE:
+            pixels = maze_pixels(visible_masks(maze, columns, rows), viewport.tile)
+            position = viewport.to_screen(columns.start, rows.start)
+            self.surface.blit(pygame.surfarray.make_surface(pixels), (position[0] - viewport.rect.x, position[1] - viewport.rect.y))
+            return
+        tiles, tile = self.table(), viewport.tile
+        blits = []
+        for y in rows:
+            if isinstance(maze, MazeGrid):
+                masks = maze.cells[y * maze.width + columns.start:y * maze.width + columns.stop]
+            else:
+                masks = [wall_mask(cell) for cell in maze[y][columns.start:columns.stop]]
+            top = y * tile - viewport.y
+            blits.extend((tiles[mask], ((columns.start + i) * tile - viewport.x, top)) for i, mask in enumerate(masks))
+        # Every tile goes to SDL in a single call instead of a blit per cell
+        self.surface.blits(blits, doreturn=False)
+
+    def update(self) -> list[pygame.Rect]:
+        """Redraws what changed since the last update: the whole view when it moved, otherwise the cells carved
+        since then. Returns the screen rects that changed"""
+        if self.maze is None:
+            return []
+        carved_since = self.events is not None and self.applied != len(self.events)
+        # Drawing the pixels of the whole view takes about as long as working out which of them a few carved cells cover
+        if self.drawn_state != self.viewport.state or carved_since and self.viewport.tile < PIXEL_TILE:
+            self.applied = len(self.events) if self.events is not None else 0
+            self.draw_visible()
+            return [self.viewport.rect.copy()]
+        if not carved_since:
+            return []
+        carved = touched_cells(self.events[self.applied:], self.viewport.width)
+        self.applied = len(self.events)
+        tiles = self.table()
+        columns, rows = self.viewport.visible()
+        dirty = []
+        for x, y in carved:
+            if x not in columns or y not in rows:
+                continue
+            rect = self.viewport.tile_rect(x, y)
+            local = rect.move(-self.viewport.rect.x, -self.viewport.rect.y)
+            # The sprites have an alpha channel, so the old tile is cleared first or it shows through
+            self.surface.fill((0, 0, 0), local)
+            self.surface.blit(tiles[wall_mask(self.maze[y][x])], local)
+            dirty.append(rect.clip(self.viewport.rect))
+        return dirty
+
+    def restore(self, screen:pygame.Surface, rect:pygame.Rect):
+        """Copies an area of the layer to the screen, covering whatever was drawn over the maze there"""
+        rect = rect.clip(self.viewport.rect)
+        screen.blit(self.surface, rect, rect.move(-self.viewport.rect.x, -self.viewport.rect.y))
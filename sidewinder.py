@@ -0,0 +1,97 @@
+import random
+from array import array
+import numpy as np
+from Direction import Direction
+from carve_events import LOG_EXTENSION, append_events
+from MazeGrid import WALL_BITS, GridCell, MazeGrid
+from maze import BINARY_EXTENSION, default_rng, generate_for_cli, random_cell, seed_arg
+
+WEST, NORTH = WALL_BITS[Direction.WEST], WALL_BITS[Direction.NORTH]
+EAST, SOUTH = WALL_BITS[Direction.EAST], WALL_BITS[Direction.SOUTH]
+
+def carve_sidewinder(length:int, width:int, rng:np.random.Generator|None=None) -> np.ndarray:
+    """Carves a whole sidewinder maze with array operations and returns its wall bits as a (length, width) uint8 array,
+    laid out like MazeGrid.cells. Every row is split into runs of cells joined east to west, and every run below the
+    first row carves north from one of its cells."""
+    rng = np.random.default_rng() if rng is None else rng
+    # 1. Flip a coin for every cell: close the run here, or carve east and keep going. Runs end at the east border
+    closes = rng.integers(0, 2, size=(length, width), dtype=np.uint8).astype(bool)
+    closes[:, -1] = True
+    # 2. The top row is a single run, it has nothing to carve north into
+    closes[0, :-1] = False
+    east = ~closes
+    cells = east * np.uint8(EAST)
+    cells[:, 1:] |= east[:, :-1] * np.uint8(WEST)
+
+    # 3. Runs never cross rows, so below the first row they can be found on the flattened grid:
+    # every run ends at a closing cell and starts right after the previous one
+    ends = np.flatnonzero(closes[1:].reshape(-1))
+    starts = np.zeros_like(ends)
+    starts[1:] = ends[:-1] + 1
+    # 4. Pick a random cell of every run to carve north from
+    picks = starts + (rng.random(len(ends)) * (ends - starts + 1)).astype(ends.dtype) + width
+    flat = cells.reshape(-1)
+    flat[picks] |= np.uint8(NORTH)
+    flat[picks - width] |= np.uint8(SOUTH)
+    return cells
+
+def sidewinder_grid(length:int, width:int, rng:np.random.Generator|None=None) -> MazeGrid:
+    """Returns a sidewinder maze as a MazeGrid sharing the memory of the carved array"""
+    return MazeGrid(length, width, memoryview(carve_sidewinder(length, width, rng).reshape(-1)))
+
+def sidewinder(length:int, width:int, animate:bool=True, record:bool=False, events:array|None=None, rng:random.Random|None=None):
+    """ based on the Sidewinder algorithm:\n
+    https://weblog.jamisbuck.org/2011/2/3/maze-generation-sidewinder-algorithm
+        Returns a tuple containing the STARTING cell, ENDING cell, and a generator function for creating the maze based on those cells.
+    """
+    rng = default_rng(rng)
+    maze = MazeGrid(length, width)
+    STARTING_CELL = random_cell(maze, rng)
+    ENDING_CELL = random_cell(maze, rng)
+    numpy_rng = np.random.default_rng(rng.getrandbits(64))
+    traversal: list[GridCell] | array = [] if animate else array('I')
+
+    def _generator():
+        carved = carve_sidewinder(length, width, numpy_rng)
+        if not animate:
+            maze.cells[:] = carved.tobytes()
+            maze.version += 1
+            if events is not None:
+                append_events(events, carved)
+            if record:
+                traversal.extend(range(width - 1, length * width, width))
+            yield maze, traversal
+            return
+        yield maze, traversal
+        for y in range(length):
+            maze.cells[y * width:(y + 1) * width] = carved[y].tobytes()
+            maze.version += 1
+            if events is not None:
+                append_events(events, carved[y], y * width)
+            traversal.append(GridCell(maze, width - 1, y))
+            yield maze, traversal
+
+    return STARTING_CELL, ENDING_CELL, _generator(), maze, traversal
+
+def parse_cli_args() :
+    import argparse
+    from sys import argv
+    parser = argparse.ArgumentParser(description='Generate\'s a maze using the Sidewinder algorithm')
+    parser.add_argument('-l', '--length', required=True, type=int, help='The length of the maze to be made')
+    parser.add_argument('-w', '--width',required=True,  type=int, help='The width of the maze to be made')
+    parser.add_argument('-seed', '--seed', type=seed_arg, help='Seed the random number generator, the same seed always makes the same maze')
+    parser.add_argument('-export', '--export',required=True,  type=str, help=f'Export the created maze to a file as an adjacency list, or in the binary format if it ends with {BINARY_EXTENSION}')
+    parser.add_argument('-log', '--log', type=str, help=f'Also write every carved wall to a generation log ({LOG_EXTENSION}), see carve_events.py')
+    if len(argv) == 1:
+        parser.print_help()
+        exit(0)
+    return parser.parse_args(argv[1:])
+
+def main():
+    '''Run if main module'''
+    args = parse_cli_args()
+    if args.length and args.width:
+        generate_for_cli(lambda **options: sidewinder(args.length, args.width, **options), args)
+
+if __name__ == '__main__':
+    main()
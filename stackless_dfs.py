@@ -0,0 +1,91 @@
+import random
+from array import array
+from Direction import DIRECTIONS, DX, DY, INVERSE
+from MazeGrid import WALL_BITS, GridTraversal, MazeGrid
+from carve_events import LOG_EXTENSION
+from maze import BINARY_EXTENSION, default_rng, generate_for_cli, new_traversal, random_cell, seed_arg
+
+def stackless_dfs(length:int, width:int, animate:bool=True, record:bool=False, events:array|None=None, rng:random.Random|None=None):
+    """ A random depth first search that backtracks without a stack.\n
+        Returns a tuple containing the STARTING cell, ENDING cell, and a generator function for creating the maze based on those cells.
+    """
+    rng = default_rng(rng)
+    maze = MazeGrid(length, width)
+    STARTING_CELL = random_cell(maze, rng)
+    ENDING_CELL = random_cell(maze, rng)
+    # Animated, the traversal is about twice as long as the maze is big, so it keeps node ids instead of cells too
+    start = STARTING_CELL.Y * width + STARTING_CELL.X
+    traversal = GridTraversal(maze, array('I', [start])) if animate else new_traversal(STARTING_CELL, width, animate, record)
+
+    def _generator():
+        cells = maze.cells
+        size = length * width
+        # The index in DIRECTIONS of the way back to the parent of every cell, four cells per byte
+        back = bytearray((size + 3) // 4)
+        steps = [DY[d] * width + DX[d] for d in DIRECTIONS]
+        bits = [WALL_BITS[d] for d in DIRECTIONS]
+        inverse_bits = [WALL_BITS[INVERSE[d]] for d in DIRECTIONS]
+        node = start
+
+        if animate:
+            yield maze, traversal
+        while True:
+            x = node % width
+            # 1. Collect the unvisited neighbours, the directions are W, N, E, S
+            options = []
+            if x > 0 and not cells[node - 1]:
+                options.append(0)
+            if node >= width and not cells[node - width]:
+                options.append(1)
+            if x < width - 1 and not cells[node + 1]:
+                options.append(2)
+            if node < size - width and not cells[node + width]:
+                options.append(3)
+            if options:
+                # 2. Carve into one of them and remember the way back
+                d = rng.choice(options)
+                following = node + steps[d]
+                cells[node] |= bits[d]
+                cells[following] |= inverse_bits[d]
+                maze.version += 1
+                back[following >> 2] |= ((d + 2) & 3) << ((following & 3) << 1)
+                if events is not None:
+                    events.append((node << 2) | d)
+                node = following
+            elif node == start:
+                # 3. Back at the start with nowhere left to go, every cell has been carved
+                break
+            else:
+                # 4. Dead end: follow the way back to the parent
+                node += steps[(back[node >> 2] >> ((node & 3) << 1)) & 3]
+            if animate or record:
+                traversal.append(node)
+            if animate:
+                yield maze, traversal
+        if not animate:
+            yield maze, traversal
+
+    return STARTING_CELL, ENDING_CELL, _generator(), maze, traversal
+
+def parse_cli_args() :
+    import argparse
+    from sys import argv
+    parser = argparse.ArgumentParser(description='Generate\'s a maze using a Random Depth First Search that backtracks without a stack')
+    parser.add_argument('-l', '--length', required=True, type=int, help='The length of the maze to be made')
+    parser.add_argument('-w', '--width',required=True,  type=int, help='The width of the maze to be made')
+    parser.add_argument('-seed', '--seed', type=seed_arg, help='Seed the random number generator, the same seed always makes the same maze')
+    parser.add_argument('-export', '--export',required=True,  type=str, help=f'Export the created maze to a file as an adjacency list, or in the binary format if it ends with {BINARY_EXTENSION}')
+    parser.add_argument('-log', '--log', type=str, help=f'Also write every carved wall to a generation log ({LOG_EXTENSION}), see carve_events.py')
+    if len(argv) == 1:
+        parser.print_help()
+        exit(0)
+    return parser.parse_args(argv[1:])
+
+def main():
+    '''Run if main module'''
+    args = parse_cli_args()
+    if args.length and args.width:
+        generate_for_cli(lambda **options: stackless_dfs(length=args.length, width=args.width, **options), args)
+
+if __name__ == '__main__':
+    main()
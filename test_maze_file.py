@@ -0,0 +1,101 @@
+import os
+import random
+from argparse import Namespace
+import tempfile
+import unittest
+from batch import generate_batch, maze_path
+from carve_events import apply_events, new_events, replay, write_log
+from kruskal import kruskal
+from MazeGrid import MazeGrid
+from maze_cache import generate_maze, maze_seed
+from maze import as_matrix, export_binary, generate_for_cli, import_binary, import_file, import_maze_details, matrix_to_str_edgelist, run_to_completion, save_maze
+from random_dfs import random_dfs
+
+class BinaryMazeFile(unittest.TestCase):
+    def setUp(self):
+        self.start, self.end, gen, self.maze, _ = random_dfs(7, 11)
+        for _ in gen:
+            pass
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "maze.maze")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip_keeps_the_graph(self):
+        export_binary(self.maze, (self.start, self.end), self.path, seed=42)
+        details = import_binary(self.path)
+        self.assertEqual(matrix_to_str_edgelist(details["graph"]), matrix_to_str_edgelist(self.maze))
+        self.assertEqual(details["start"].coordinate, self.start.coordinate)
+        self.assertEqual(details["end"].coordinate, self.end.coordinate)
+        self.assertEqual(details["seed"], 42)
+
+    def test_import_maze_details_reads_binary_files(self):
+        export_binary(self.maze, (self.start, self.end), self.path)
+        details = import_maze_details(self.path)
+        self.assertEqual(set(details), {"graph", "start", "end"})
+        self.assertEqual(matrix_to_str_edgelist(as_matrix(details["graph"])), matrix_to_str_edgelist(self.maze))
+
+    def test_recorded_traversal_is_saved_as_coordinates(self):
+        path = os.path.join(self.directory.name, "maze.json")
+        _, _, gen, _, animated = kruskal(6, 5, rng=random.Random(4))
+        for _ in gen:
+            pass
+        start, end, maze, recorded = run_to_completion(kruskal(6, 5, animate=False, record=True, rng=random.Random(4)))
+        save_maze(maze, (start, end), path, recorded)
+        self.assertEqual(import_file(path)["traversal"], [str(cell) for cell in animated])
+
+    def test_cli_generation_saves_only_what_is_asked_for(self):
+        log = os.path.join(self.directory.name, "maze.mazelog")
+        # Without an export nothing is saved or recorded
+        generate_for_cli(lambda **options: kruskal(6, 5, **options), Namespace(export=None, log=None, seed=4))
+        self.assertEqual(os.listdir(self.directory.name), [])
+        _, _, maze = generate_for_cli(lambda **options: kruskal(6, 5, **options), Namespace(export=self.path, log=log, seed=4))
+        self.assertEqual(import_binary(self.path)["seed"], 4)
+        self.assertEqual(bytes(replay(log)[0].cells), bytes(maze.cells))
+
+class GenerationLog(unittest.TestCase):
+    def test_events_rebuild_the_maze(self):
+        events = new_events()
+        _, _, gen, maze, _ = random_dfs(8, 6, events=events)
+        for _ in gen:
+            pass
+        self.assertEqual(len(events), 8 * 6 - 1)
+        rebuilt = MazeGrid(8, 6)
+        apply_events(rebuilt, events)
+        self.assertEqual(matrix_to_str_edgelist(rebuilt), matrix_to_str_edgelist(maze))
+
+    def test_log_round_trip(self):
+        events = new_events()
+        start, end, gen, maze, _ = kruskal(9, 12, events=events)
+        for _ in gen:
+            pass
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "maze.mazelog")
+            write_log(events, 9, 12, (start, end), path)
+            replayed, replayed_start, replayed_end = replay(path)
+        self.assertEqual(replayed.cells, maze.cells)
+        self.assertEqual(replayed_start.coordinate, start.coordinate)
+        self.assertEqual(replayed_end.coordinate, end.coordinate)
+
+class BatchGeneration(unittest.TestCase):
+    def test_batch_writes_seeded_mazes_to_shards(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cells = generate_batch("kruskal", 6, 5, 5, directory, base_seed=9, workers=2, shard_size=2)
+            self.assertEqual(cells, 5 * 6 * 5)
+            self.assertEqual(sorted(os.listdir(directory)), ["shard_00000", "shard_00001", "shard_00002"])
+            # Every maze is the one its seed makes, whichever worker made it
+            for number in range(5):
+                details = import_binary(maze_path(directory, number, 2, ".maze"))
+                _, _, expected = generate_maze("kruskal", 6, 5, maze_seed(9, number))
+                self.assertEqual(bytes(details["graph"].cells), bytes(expected.cells))
+                self.assertEqual(details["seed"], maze_seed(9, number))
+                del details
+
+    def test_maze_seeds_fit_in_the_header(self):
+        seeds = {maze_seed(base, number) for base in (0, 2**32, -1, 2**100) for number in range(4)}
+        self.assertEqual(len(seeds), 16)
+        self.assertTrue(all(0 <= seed < 2**63 for seed in seeds))
+
+if __name__ == '__main__':
+    unittest.main()
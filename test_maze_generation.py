@@ -1,8 +1,23 @@
+import random
 import unittest
 from Cell import Cell
-from maze import make_initial_maze, random_cell
+from Direction import Direction
+from MazeGrid import MazeGrid
+from MazeIndex import MazeIndex
+from TreePathIndex import TreePathIndex
+from State import State
+from maze import make_initial_maze, matrix_to_str_edgelist, run_to_completion
+import maze_cache
+from binary_tree import binary_tree, binary_tree_grid
+from eller import eller
+from growing_tree import Frontier, at_random, growing_tree, mixed, newest, oldest
+from kruskal import kruskal, shuffled_walls
 from prim import prim
 from random_dfs import random_dfs
+from sidewinder import sidewinder, sidewinder_grid
+from stackless_dfs import stackless_dfs
+from tiled import tiled_maze
+from wilson import wilson
 
 def collect_isoleted_cells(maze: list[list[Cell]]):
     """Collects all the isolated cells in the maze"""
@@ -26,6 +41,137 @@ class MazeGeneration(unittest.TestCase):
             pass
         # Assert that there are no isolated cells in the output
         self.assertEqual(len(collect_isoleted_cells(maze)), 0, "There are isolated cells in the output")
+    def test_prim_on_grid_has_no_isolated_cells(self):
+        _,_, gen, maze, _ = prim(MazeGrid(30,20))
+        for _ in gen:
+            pass
+        self.assertEqual(len(collect_isoleted_cells(maze)), 0, "There are isolated cells in the output")
+    def test_random_dfs_on_grid_has_no_isolated_cells(self):
+        _,_, gen, maze, _ = random_dfs(30,20, make_maze=MazeGrid)
+        for _ in gen:
+            pass
+        self.assertEqual(len(collect_isoleted_cells(maze)), 0, "There are isolated cells in the output")
+    def test_kruskal_makes_a_perfect_maze(self):
+        _,_, gen, maze, _ = kruskal(30,20)
+        for _ in gen:
+            pass
+        self.assertEqual(len(collect_isoleted_cells(maze)), 0, "There are isolated cells in the output")
+        # A spanning tree has one passage less than it has cells
+        self.assertEqual(MazeIndex(maze).edge_count(), 30 * 20 - 1)
+    def test_kruskal_shuffles_every_inner_wall_once(self):
+        for length, width in [(1, 1), (1, 9), (9, 1), (23, 31)]:
+            walls = shuffled_walls(length, width, random.Random(length))
+            east = [node * 2 for node in range(length * width) if node % width != width - 1]
+            south = [node * 2 + 1 for node in range(length * width - width)]
+            self.assertEqual(sorted(walls), sorted(east + south))
+    def test_growing_tree_policies_make_perfect_mazes(self):
+        for policy in (newest, oldest, at_random, mixed((newest, 3), (oldest, 1), (at_random, 1))):
+            _,_, gen, maze, _ = growing_tree(MazeGrid(21,16), policy)
+            for _ in gen:
+                pass
+            TreePathIndex(MazeIndex(maze))
+    def test_frontier_positions_keep_the_oldest_and_newest(self):
+        rng = random.Random(3)
+        frontier = Frontier(200, 0)
+        added = [0]
+        for node in range(1, 200):
+            frontier.add(node)
+            added.append(node)
+            if rng.random() < 0.6:
+                # Every position is a different node, the first the oldest and the last the newest
+                picked = [frontier.at(position) for position in range(len(frontier))]
+                self.assertEqual(sorted(picked), added)
+                self.assertEqual((picked[0], picked[-1]), (added[0], added[-1]))
+                removed = picked[rng.choice([0, -1, rng.randrange(len(picked))])]
+                frontier.remove(removed)
+                added.remove(removed)
+    def test_stackless_dfs_makes_a_perfect_maze(self):
+        for length, width in [(1, 1), (1, 7), (7, 1), (26, 19)]:
+            start,_, gen, maze, traversal = stackless_dfs(length, width)
+            for _ in gen:
+                pass
+            TreePathIndex(MazeIndex(maze))
+            # Every passage is walked once forwards and once backwards
+            self.assertEqual(len(traversal), 2 * (length * width - 1) + 1)
+            self.assertEqual(traversal[-1], start)
+    def test_wilson_makes_a_perfect_maze(self):
+        stats: dict[str,int] = {}
+        _,_, gen, maze, _ = wilson(25,18, stats=stats)
+        for _ in gen:
+            pass
+        TreePathIndex(MazeIndex(maze))
+        self.assertEqual(stats["carved"], 25 * 18 - 1)
+        self.assertGreaterEqual(stats["steps"], stats["carved"])
+    def test_run_to_completion_carves_without_animating(self):
+        for generate in (random_dfs, kruskal, wilson, stackless_dfs, binary_tree, sidewinder):
+            _, _, maze, traversal = run_to_completion(generate(14, 11, animate=False))
+            TreePathIndex(MazeIndex(maze))
+            self.assertEqual(len(traversal), 0, generate.__name__)
+        # Recorded traversals are node ids, in the same order the animation visits the cells
+        _, _, maze, traversal = run_to_completion(prim(make_initial_maze(14, 11), animate=False, record=True))
+        self.assertEqual(len(traversal), 14 * 11)
+        self.assertEqual(len(set(traversal)), 14 * 11)
+    def test_seeded_generators_repeat_their_mazes(self):
+        for algorithm, generate in maze_cache.GENERATORS.items():
+            first = run_to_completion(generate(13, 10, random.Random(5)))
+            second = run_to_completion(generate(13, 10, random.Random(5)))
+            self.assertEqual(bytes(first[2].cells), bytes(second[2].cells), algorithm)
+            self.assertEqual(first[0].coordinate, second[0].coordinate, algorithm)
+            self.assertEqual(first[1].coordinate, second[1].coordinate, algorithm)
+    def test_maze_cache_returns_copies_of_the_same_maze(self):
+        start, end, maze = maze_cache.generate_maze("kruskal", 12, 9, 3)
+        maze.cells[0] = 0
+        cached_start, cached_end, cached = maze_cache.generate_maze("kruskal", 12, 9, 3)
+        self.assertIsNot(cached, maze)
+        self.assertEqual(bytes(cached.cells), maze_cache.packed_maze("kruskal", 12, 9, 3)[0])
+        self.assertEqual((cached_start.coordinate, cached_end.coordinate), (start.coordinate, end.coordinate))
+        TreePathIndex(MazeIndex(cached))
+    def test_animated_mazes_can_be_cached(self):
+        start, end, gen, maze, _ = prim(make_initial_maze(8, 7), rng=random.Random(11))
+        for _ in gen:
+            pass
+        self.assertFalse(maze_cache.is_cached("prim", 8, 7, 11))
+        maze_cache.remember_maze("prim", 8, 7, 11, start, end, maze)
+        cached_start, cached_end, cached = maze_cache.generate_maze("prim", 8, 7, 11)
+        self.assertEqual(matrix_to_str_edgelist(cached), matrix_to_str_edgelist(maze))
+        self.assertEqual((cached_start.coordinate, cached_end.coordinate), (start.coordinate, end.coordinate))
+    def test_tiled_maze_is_a_single_perfect_maze(self):
+        for algorithm in ("kruskal", "random_dfs"):
+            _, _, maze = tiled_maze(23, 30, 8, algorithm, seed=6, workers=2)
+            TreePathIndex(MazeIndex(maze))
+            self.assertEqual(len(collect_isoleted_cells(maze)), 0)
+        self.assertEqual(tiled_maze(12, 12, 5, seed=1, workers=2)[2].cells, tiled_maze(12, 12, 5, seed=1, workers=1)[2].cells)
+        # The forests of the tiles are joined in many places, not by one passage between two tiles
+        _, _, maze = tiled_maze(32, 32, 16, seed=1, workers=2)
+        TreePathIndex(MazeIndex(maze))
+        self.assertGreater(sum(1 for y in range(32) if maze[y][15].walls[Direction.EAST] is State.VISITED), 2)
+        self.assertGreater(sum(1 for x in range(32) if maze[15][x].walls[Direction.SOUTH] is State.VISITED), 2)
+    def test_eller_streams_a_perfect_maze(self):
+        rows = list(eller(40, 15))
+        self.assertTrue(all(len(row) == 15 for row in rows))
+        maze = MazeGrid(40, 15, bytearray(b"".join(rows)))
+        self.assertEqual(MazeIndex(maze).edge_count(), 40 * 15 - 1)
+        # Only a spanning tree can be walked without finding a loop or unreachable cells
+        TreePathIndex(MazeIndex(maze))
+    def test_vectorized_generators_make_perfect_mazes(self):
+        for make in (binary_tree_grid, sidewinder_grid):
+            for length, width in [(1, 1), (1, 9), (9, 1), (23, 17)]:
+                maze = make(length, width)
+                TreePathIndex(MazeIndex(maze))
+                # Every passage is listed from both of its cells
+                graph = matrix_to_str_edgelist(maze)
+                self.assertTrue(all(cell in graph[neighbor] for cell, neighbors in graph.items() for neighbor in neighbors))
+    def test_grid_exports_the_same_graph_as_cells(self):
+        _,_, gen, maze, _ = random_dfs(12,9)
+        for _ in gen:
+            pass
+        # Copy the carved walls of the cells into a grid
+        grid = MazeGrid(12,9)
+        for row in maze:
+            for cell in row:
+                for d in cell.visited_walls():
+                    grid[cell.Y][cell.X].walls[d] = State.VISITED
+        self.assertEqual(matrix_to_str_edgelist(grid), matrix_to_str_edgelist(maze))
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,180 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import unittest
+import numpy as np
+import pygame
+from Cell import Cell
+from Direction import DIRECTIONS, Direction
+from MazeGrid import WALL_BITS, MazeGrid
+from Viewport import Viewport
+from carve_events import new_events, pack_event
+from render_maze import SPRITE_KEYS, MarkedCells, MazeLayer, cell_pixels, maze_pixels, wall_mask
+
+# The sprite the maze was drawn with for the directions of the carved walls, before the sprites were indexed by mask
+DIRECTION_SPRITES = {
+    '': 'unsectioned', 'NS': 'VERTICAL', 'WE': 'HORIZONTAL', 'WNS': 'V_west', 'NES': 'V_east', 'WES': 'H_south',
+    'WNE': 'H_north', 'WS': 'SOUTHWEST', 'ES': 'SOUTHEAST', 'WN': 'NORTHWEST', 'NE': 'NORTHEAST', 'E': 'westOOB',
+    'W': 'eastOOB', 'S': 'northOOB', 'N': 'southOOB', 'WNES': 'INTERSECTION',
+}
+
+def sprites(size:int) -> dict[str,pygame.Surface]:
+    paths = {}
+    for i, key in enumerate(SPRITE_KEYS):
+        paths[key] = pygame.Surface((size, size))
+        paths[key].fill((i * 10 + 5, 0, 0))
+    return paths
+
+class Rendering(unittest.TestCase):
+    def test_sprite_keys_match_the_wall_directions(self):
+        for mask in range(16):
+            cell = Cell(0, 0)
+            grid = MazeGrid(1, 1)
+            grid.cells[0] = mask
+            for d in DIRECTIONS:
+                if mask & WALL_BITS[d]:
+                    cell.open_wall(d)
+            for c in (cell, grid[0][0]):
+                directions = "".join(str(d) for d in c.visited_walls())
+                self.assertEqual(SPRITE_KEYS[wall_mask(c)], DIRECTION_SPRITES[directions], mask)
+
+    def test_zoom_levels(self):
+        viewport = Viewport(75, pygame.Rect(0, 0, 300, 200))
+        levels = viewport.ZOOM_LEVELS
+        self.assertEqual(levels[0], 75)
+        self.assertEqual(levels, sorted(levels, reverse=True))
+        for tile in levels:
+            # Whole pixels, or whole fractions of one
+            self.assertTrue(tile == int(tile) or (1 / tile) == round(1 / tile), tile)
+        self.assertGreaterEqual(levels[-1] * Viewport.MAX_CELLS_PER_PIXEL, 1)
+        self.assertLess(levels[-1] * 0.8 * Viewport.MAX_CELLS_PER_PIXEL, 1)
+
+    def test_min_tile(self):
+        viewport = Viewport(75, pygame.Rect(0, 0, 300, 200))
+        viewport.set_maze(2, 2)
+        self.assertEqual(viewport.tile, 75)
+        viewport.set_maze(30, 10)
+        self.assertEqual(viewport.tile, max(t for t in viewport.ZOOM_LEVELS if t * 30 <= 300 and t * 10 <= 200))
+        # Too big to fit even zoomed all the way out
+        viewport.set_maze(100_000, 10)
+        self.assertEqual(viewport.tile, viewport.ZOOM_LEVELS[-1])
+
+    def test_clamp(self):
+        viewport = Viewport(10, pygame.Rect(50, 50, 100, 80))
+        viewport.set_maze(5, 5)
+        # Smaller than the view, there is nowhere to scroll
+        viewport.pan(30, 30)
+        self.assertEqual((viewport.x, viewport.y), (0, 0))
+        viewport.set_maze(25, 12)
+        viewport.tile = 10
+        viewport.pan(1000, 1000)
+        self.assertEqual((viewport.x, viewport.y), (25 * 10 - 100, 12 * 10 - 80))
+        viewport.pan(-1000, -5)
+        self.assertEqual((viewport.x, viewport.y), (0, 12 * 10 - 85))
+
+    def test_visible(self):
+        viewport = Viewport(10, pygame.Rect(50, 50, 100, 80))
+        viewport.set_maze(25, 12)
+        viewport.tile = 10
+        self.assertEqual(viewport.visible(), (range(0, 10), range(0, 8)))
+        # Cells only partly in the view count as visible
+        viewport.pan(5, 3)
+        self.assertEqual(viewport.visible(), (range(0, 11), range(0, 9)))
+        # Past the edge of the maze there are no cells
+        viewport.pan(1000, 1000)
+        self.assertEqual(viewport.visible(), (range(15, 25), range(4, 12)))
+        viewport.set_maze(3, 2)
+        viewport.tile = 10
+        self.assertEqual(viewport.visible(), (range(0, 3), range(0, 2)))
+
+    def test_zoom(self):
+        viewport = Viewport(75, pygame.Rect(0, 0, 300, 200))
+        viewport.set_maze(1000, 1000)
+        smallest = viewport.tile
+        # Not past the level where the maze fits, nor past the biggest
+        viewport.zoom(-5)
+        self.assertEqual(viewport.tile, smallest)
+        viewport.zoom(100)
+        self.assertEqual(viewport.tile, 75)
+        viewport.zoom(-1)
+        self.assertEqual(viewport.tile, viewport.ZOOM_LEVELS[1])
+        # The cell under the anchor stays under it
+        viewport.x, viewport.y = 20_000, 10_000
+        anchor = (123, 77)
+        cell = ((viewport.x + anchor[0]) / viewport.tile, (viewport.y + anchor[1]) / viewport.tile)
+        viewport.zoom(-2, anchor)
+        self.assertAlmostEqual((viewport.x + anchor[0]) / viewport.tile, cell[0], delta=1)
+        self.assertAlmostEqual((viewport.y + anchor[1]) / viewport.tile, cell[1], delta=1)
+
+    def test_layer_only_redraws_what_changed(self):
+        viewport = Viewport(75, pygame.Rect(10, 20, 300, 225))
+        layer = MazeLayer(sprites(75), viewport)
+        maze = MazeGrid(40, 40)
+        events = new_events()
+        layer.attach(maze, events)
+        viewport.tile = 75
+        self.assertEqual(layer.update(), [viewport.rect])
+        self.assertEqual(layer.update(), [])
+        # Carved in the view, both cells of the wall are redrawn
+        maze.carve(1, 1, Direction.EAST)
+        events.append(pack_event(1, 1, Direction.EAST, maze.width))
+        dirty = layer.update()
+        self.assertEqual(sorted(map(tuple, dirty)), sorted([tuple(viewport.tile_rect(1, 1)), tuple(viewport.tile_rect(2, 1))]))
+        # The tile shows the new walls
+        self.assertEqual(layer.surface.get_at((75 + 1, 75 + 1))[0], SPRITE_KEYS.index('westOOB') * 10 + 5)
+        # Out of the view, nothing is
+        maze.carve(30, 30, Direction.SOUTH)
+        events.append(pack_event(30, 30, Direction.SOUTH, maze.width))
+        self.assertEqual(layer.update(), [])
+        # A cell partly in the view is clipped to it
+        maze.carve(4, 2, Direction.NORTH)
+        events.append(pack_event(4, 2, Direction.NORTH, maze.width))
+        for rect in layer.update():
+            self.assertTrue(viewport.rect.contains(rect))
+        # Moving the view draws all of it
+        viewport.pan(75, 0)
+        self.assertEqual(layer.update(), [viewport.rect])
+
+    def test_layer_in_pixels_redraws_the_view(self):
+        viewport = Viewport(75, pygame.Rect(0, 0, 200, 100))
+        layer = MazeLayer(sprites(75), viewport)
+        maze = MazeGrid(300, 500)
+        events = new_events()
+        layer.attach(maze, events)
+        self.assertLess(viewport.tile, 1)
+        self.assertEqual(layer.update(), [viewport.rect])
+        maze.carve(0, 0, Direction.EAST)
+        events.append(pack_event(0, 0, Direction.EAST, maze.width))
+        self.assertEqual(layer.update(), [viewport.rect])
+        self.assertEqual(layer.update(), [])
+
+    def test_pixel_shapes(self):
+        masks = np.arange(7 * 5, dtype=np.uint8).reshape(7, 5) % 16
+        marked = masks % 3 == 0
+        for tile in (1 / 16, 1 / 3, 1 / 2, 1, 2, 3):
+            if tile < 1:
+                n = round(1 / tile)
+                size = (-(-5 // n), -(-7 // n))
+            else:
+                size = (5 * tile, 7 * tile)
+            self.assertEqual(maze_pixels(masks, tile).shape, size + (3,), tile)
+            self.assertEqual(cell_pixels(marked, tile).shape, size, tile)
+        # Any marked cell under a pixel marks it
+        self.assertEqual(cell_pixels(np.eye(4, dtype=bool), 1 / 2).tolist(), [[True, False], [False, True]])
+
+    def test_marking_cells_paints_them_like_the_whole_view(self):
+        viewport = Viewport(75, pygame.Rect(0, 0, 120, 90))
+        for width, length in [(20, 15), (200, 150), (900, 700)]:
+            viewport.set_maze(width, length)
+            marks = MarkedCells((200, 100, 50))
+            marks.reset(np.zeros((length, width), dtype=bool))
+            screen = pygame.Surface((120, 90))
+            marks.render(screen, viewport)
+            rng = np.random.default_rng(width)
+            for _ in range(50):
+                marks.mark(int(rng.integers(width)), int(rng.integers(length)))
+            painted = pygame.surfarray.array3d(marks.surface)
+            marks.paint(viewport)
+            self.assertTrue((painted == pygame.surfarray.array3d(marks.surface)).all(), viewport.tile)
+
+if __name__ == "__main__":
+    unittest.main()
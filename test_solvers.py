@@ -0,0 +1,157 @@
+import unittest
+from Direction import Direction
+from MazeGrid import MazeGrid
+from DistanceMap import distance_map
+from MazeIndex import MazeIndex, index_of
+from TreePathIndex import TreePathIndex
+from a_star import a_star_search
+from carve_events import apply_events, pack_event
+from bidirectional_bfs import bidirectional_bfs
+from breadth_first_search import breadth_first_search
+from depth_first_search import depth_first_search
+from maze import make_initial_maze, matrix_to_edgelist
+from random_dfs import random_dfs
+from sidewinder import sidewinder_grid
+from SolverScreen import WALK_LIMIT, solve
+
+def generate(length:int, width:int, make_maze=make_initial_maze):
+    start, end, gen, maze, _ = random_dfs(length, width, make_maze)
+    for _ in gen:
+        pass
+    return start, end, maze
+
+class Solvers(unittest.TestCase):
+    def test_index_matches_the_edgelist(self):
+        _, _, maze = generate(9, 14)
+        index = MazeIndex(maze)
+        edgelist = matrix_to_edgelist(maze)
+        for cell, neighbors in edgelist.items():
+            self.assertEqual([index.cell(n) for n in index.neighbors(index.node(cell))], neighbors)
+        # A perfect maze is a spanning tree
+        self.assertEqual(index.edge_count(), 9 * 14 - 1)
+
+    def test_index_is_cached_per_maze(self):
+        _, _, maze = generate(5, 5)
+        self.assertIs(index_of(maze), index_of(maze))
+        _, _, other = generate(5, 5)
+        self.assertIsNot(index_of(other).source, maze)
+        # Switching back doesn't build it again
+        index = index_of(maze)
+        index_of(other)
+        self.assertIs(index_of(maze), index)
+
+    def test_index_is_rebuilt_when_the_grid_is_carved(self):
+        maze = MazeGrid(4, 4)
+        maze[0][0].visit(maze[0][1], Direction.EAST)
+        self.assertEqual(index_of(maze).edge_count(), 1)
+        self.assertIs(index_of(maze), index_of(maze))
+        maze.carve(1, 0, Direction.SOUTH)
+        self.assertEqual(index_of(maze).edge_count(), 2)
+        # Carved straight into the cells, the way the generators do
+        apply_events(maze, [pack_event(1, 1, Direction.EAST, 4)])
+        self.assertEqual(index_of(maze).edge_count(), 3)
+
+    def test_solvers_agree_on_the_path(self):
+        for make_maze in (make_initial_maze, MazeGrid):
+            start, end, maze = generate(12, 17, make_maze)
+            index = MazeIndex(maze)
+            dfs_path, _ = depth_first_search(index, start, end)
+            bfs_path, _ = breadth_first_search(index, start, end)
+            a_star_path, _ = a_star_search({"graph": index, "start": start, "end": end})
+            bidirectional_path, _ = bidirectional_bfs(index, start, end)
+            self.assertEqual(dfs_path, [cell.coordinate for cell in bfs_path])
+            self.assertEqual(dfs_path, [cell.coordinate for cell in bidirectional_path])
+            self.assertEqual(dfs_path, [cell.coordinate for cell in a_star_path])
+            self.assertEqual(dfs_path[0], start.coordinate)
+            self.assertEqual(dfs_path[-1], end.coordinate)
+    def test_depth_first_search_reports_peak_stack(self):
+        start, end, maze = generate(8, 8)
+        stats:dict[str,int] = {}
+        path, _ = depth_first_search(maze, start, end, stats)
+        self.assertGreaterEqual(stats["peak_stack"], 1)
+        self.assertEqual(path[0], start.coordinate)
+        self.assertEqual(path[-1], end.coordinate)
+
+    def test_a_star_finds_shortest_paths_in_braided_mazes(self):
+        _, _, maze = generate(15, 15, MazeGrid)
+        # Knock down every wall along two rows so the maze has loops
+        for y in (4, 10):
+            for x in range(14):
+                maze.carve(x, y, Direction.EAST)
+        index = MazeIndex(maze)
+        start, end = maze[0][0], maze[14][14]
+        bfs_stats:dict[str,int] = {}
+        a_star_stats:dict[str,int] = {}
+        bfs_path, _ = breadth_first_search(index, start, end, bfs_stats)
+        a_star_path, _ = a_star_search({"graph": index, "start": start, "end": end}, stats=a_star_stats)
+        dijkstra_path, _ = a_star_search({"graph": index, "start": start, "end": end}, heuristic=lambda a, b: 0)
+        bidirectional_path, _ = bidirectional_bfs(index, start, end)
+        self.assertEqual(len(a_star_path), len(bfs_path))
+        self.assertEqual(len(bidirectional_path), len(bfs_path))
+        self.assertEqual(len(dijkstra_path), len(bfs_path))
+        self.assertLessEqual(a_star_stats["expanded"], bfs_stats["expanded"])
+
+    def test_tree_path_index_matches_breadth_first_search(self):
+        _, _, maze = generate(11, 16)
+        index = MazeIndex(maze)
+        tree = TreePathIndex(index)
+        for a, b in [(maze[0][0], maze[10][15]), (maze[5][3], maze[2][12]), (maze[7][7], maze[7][7])]:
+            path, _ = breadth_first_search(index, a, b)
+            self.assertEqual(tree.cell_path(a, b), [cell.coordinate for cell in path])
+            self.assertEqual(tree.distance(index.node(a), index.node(b)), len(path) - 1)
+
+    def test_tree_path_index_rejects_mazes_with_loops(self):
+        _, _, maze = generate(6, 6, MazeGrid)
+        # Knock down one more wall, which always closes a loop in a perfect maze
+        cell, wall = next((cell, d) for row in maze for cell in row for d in cell.unvisited_walls())
+        cell.visit(maze[cell.Y + wall.value[1]][cell.X + wall.value[0]], wall)
+        with self.assertRaises(ValueError):
+            TreePathIndex(MazeIndex(maze))
+
+    def test_distance_map_is_reused_for_new_goals(self):
+        start, _, maze = generate(9, 9)
+        index = MazeIndex(maze)
+        distances = distance_map(index, start)
+        self.assertIs(distance_map(MazeIndex(maze), start), distances)
+        for goal in (maze[0][0], maze[8][8], maze[4][6]):
+            path, _ = breadth_first_search(index, start, goal)
+            self.assertEqual(distances.cell_path(goal), [cell.coordinate for cell in path])
+        nearby = distances.within(3)
+        self.assertTrue(all(distances.distance[node] <= 3 for node in nearby))
+        self.assertEqual(len(nearby), sum(1 for d in distances.distance if 0 <= d <= 3))
+
+    def test_traversal_is_a_walk(self):
+        start, end, maze = generate(10, 13)
+        index = MazeIndex(maze)
+        _, bfs_traversal = breadth_first_search(index, start, end)
+        _, a_star_traversal = a_star_search({"graph": index, "start": start, "end": end})
+        _, bidirectional_traversal = bidirectional_bfs(index, start, end)
+        # It walks from the start to where both searches meet, and on to the end
+        self.assertEqual(bidirectional_traversal[0], start.coordinate)
+        self.assertEqual(bidirectional_traversal[-1], end.coordinate)
+        for traversal in (bfs_traversal, a_star_traversal, bidirectional_traversal):
+            for a, b in zip(traversal, traversal[1:]):
+                # Consecutive cells are either the same cell or connected by a passage
+                if a != b:
+                    self.assertIn(index.node(maze[b[1]][b[0]]), list(index.neighbors(index.node(maze[a[1]][a[0]]))))
+
+    def test_large_mazes_walk_the_path_instead_of_the_search(self):
+        # A search of a maze this big walks millions of cells between the cells it expands
+        maze = sidewinder_grid(500, 500)
+        index = index_of(maze)
+        start, end = maze[0][0], maze[499][499]
+        shortest = distance_map(index, start).cell_path(end)
+        for solver in ("breadth_first_search", "bidirectional_bfs", "a_star", "depth_first_search"):
+            path, traversal = solve(solver, index, start, end)
+            self.assertLessEqual(len(traversal), WALK_LIMIT, solver)
+            self.assertEqual(path[0], start.coordinate, solver)
+            self.assertEqual(path[-1], end.coordinate, solver)
+            if solver != "depth_first_search":
+                self.assertEqual(path, shortest, solver)
+        # Small mazes still animate the whole search
+        start, end, small = generate(10, 13)
+        _, traversal = solve("breadth_first_search", index_of(small), start, end)
+        self.assertEqual(traversal, breadth_first_search(index_of(small), start, end)[1])
+
+if __name__ == '__main__':
+    unittest.main()
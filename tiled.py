@@ -0,0 +1,171 @@
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from Direction import Direction
+from MazeGrid import WALL_BITS, GridCell, MazeGrid
+from maze import BINARY_EXTENSION, random_cell, run_to_completion, save_maze, seed_arg
+from maze_cache import GENERATORS, maze_seed
+
+EAST, WEST = WALL_BITS[Direction.EAST], WALL_BITS[Direction.WEST]
+SOUTH, NORTH = WALL_BITS[Direction.SOUTH], WALL_BITS[Direction.NORTH]
+
+def label_trees(cells:bytearray, length:int, width:int) -> array:
+    """Returns the number of the tree every cell of a forest belongs to, numbered from 0 in the order they are found"""
+    labels = array('i', [-1]) * (length * width)
+    steps = ((WEST, -1), (NORTH, -width), (EAST, 1), (SOUTH, width))
+    label = 0
+    for root in range(length * width):
+        if labels[root] != -1:
+            continue
+        labels[root] = label
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            bits = cells[node]
+            for bit, step in steps:
+                if bits & bit and labels[node + step] == -1:
+                    labels[node + step] = label
+                    stack.append(node + step)
+        label += 1
+    return labels
+
+def carve_tile(memory_name:str, width:int, top:int, left:int, tile_length:int, tile_width:int, algorithm:str, seed:int, cuts:int):
+    """Generates a perfect maze the size of a tile, cuts `cuts` of its passages so it falls apart into a forest of trees,
+    and copies it into its place in the shared grid. Runs in the worker processes.
+    Returns the tree of every cell along the left, right, top and bottom of the tile, and the passages that were cut
+    as (node, bit, tree, tree) with the node in the whole maze and the bit of its east or south wall."""
+    rng = random.Random(seed)
+    _, _, tile, _ = run_to_completion(GENERATORS[algorithm](tile_length, tile_width, rng))
+    cells = tile.cells
+    passages = [(node << 1) | south for node in range(tile_length * tile_width) for south, bit in enumerate((EAST, SOUTH)) if cells[node] & bit]
+    cut = rng.sample(passages, min(cuts, len(passages)))
+    for passage in cut:
+        node = passage >> 1
+        if passage & 1:
+            cells[node] &= ~SOUTH
+            cells[node + tile_width] &= ~NORTH
+        else:
+            cells[node] &= ~EAST
+            cells[node + 1] &= ~WEST
+    labels = label_trees(cells, tile_length, tile_width)
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        for y in range(tile_length):
+            offset = (top + y) * width + left
+            memory.buf[offset:offset + tile_width] = cells[y * tile_width:(y + 1) * tile_width]
+    finally:
+        memory.close()
+    cut_passages = []
+    for passage in cut:
+        node = passage >> 1
+        other = node + tile_width if passage & 1 else node + 1
+        y, x = divmod(node, tile_width)
+        cut_passages.append(((top + y) * width + left + x, SOUTH if passage & 1 else EAST, labels[node], labels[other]))
+    borders = (labels[0::tile_width], labels[tile_width - 1::tile_width], labels[:tile_width], labels[-tile_width:])
+    return borders, cut_passages
+
+def stitch_tiles(maze:MazeGrid, tile_size:int, trees:list[tuple], trees_per_tile:int, rng:random.Random):
+    """Joins the forests of every tile into a single perfect maze, using what `carve_tile` returned for every tile.
+    This is Kruskal's over the trees: every pair of cells facing each other across the seam between two tiles is
+    shuffled, and a passage is carved between them whenever it joins two separate sets of trees. Trees no seam
+    reaches are joined back through the passages they were cut off by, so the result is always a spanning tree."""
+    cells, length, width = maze.cells, maze.length, maze.width
+    rows = (length + tile_size - 1) // tile_size
+    columns = (width + tile_size - 1) // tile_size
+    # A tree is numbered after its tile, so the trees of every tile get their own range of numbers
+    def tree(tile:int, label:int) -> int:
+        return tile * trees_per_tile + label
+    # Every seam edge as (node, bit, tree, tree), with the bit of the east or south wall of the node
+    seams: list[tuple[int, int, int, int]] = []
+    for tile in range(rows * columns):
+        top, left = (tile // columns) * tile_size, (tile % columns) * tile_size
+        _, right, _, bottom = trees[tile][0]
+        if tile % columns != columns - 1:
+            x = left + tile_size - 1
+            for i, label in enumerate(right):
+                seams.append(((top + i) * width + x, EAST, tree(tile, label), tree(tile + 1, trees[tile + 1][0][0][i])))
+        if tile // columns != rows - 1:
+            y = top + tile_size - 1
+            for i, label in enumerate(bottom):
+                seams.append((y * width + left + i, SOUTH, tree(tile, label), tree(tile + columns, trees[tile + columns][0][2][i])))
+    rng.shuffle(seams)
+    for tile, (_, cut) in enumerate(trees):
+        seams.extend((node, bit, tree(tile, a), tree(tile, b)) for node, bit, a, b in cut)
+    parent = list(range(rows * columns * trees_per_tile))
+    def find(tree:int) -> int:
+        while parent[tree] != tree:
+            parent[tree] = parent[parent[tree]]
+            tree = parent[tree]
+        return tree
+    for node, bit, a, b in seams:
+        a, b = find(a), find(b)
+        if a == b:
+            continue
+        parent[b] = a
+        if bit == SOUTH:
+            cells[node] |= SOUTH
+            cells[node + width] |= NORTH
+        else:
+            cells[node] |= EAST
+            cells[node + 1] |= WEST
+    maze.version += 1
+
+def tiled_maze(length:int, width:int, tile_size:int=256, algorithm:str="kruskal", seed:int|None=None, workers:int|None=None, cuts:int|None=None) -> tuple[GridCell, GridCell, MazeGrid]:
+    """Generates a single perfect maze by splitting it into square tiles, generating every tile in its own process
+    straight into shared memory, and stitching the tiles together. Returns the STARTING cell, ENDING cell and maze.
+    Every tile has `cuts` of its passages cut, a quarter of the tile size by default, so neighbouring tiles are joined
+    through many passages and the tiles can't be seen in the maze."""
+    seed = random.getrandbits(31) if seed is None else seed
+    cuts = tile_size // 4 if cuts is None else cuts
+    tiles = [
+        (top, left, min(tile_size, length - top), min(tile_size, width - left))
+        for top in range(0, length, tile_size)
+        for left in range(0, width, tile_size)
+    ]
+    memory = shared_memory.SharedMemory(create=True, size=length * width)
+    try:
+        memory.buf[:length * width] = bytes(length * width)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(carve_tile, memory.name, width, top, left, tile_length, tile_width, algorithm, maze_seed(seed, number), cuts)
+                for number, (top, left, tile_length, tile_width) in enumerate(tiles)
+            ]
+            trees = [future.result() for future in futures]
+        maze = MazeGrid(length, width, bytearray(memory.buf[:length * width]))
+    finally:
+        memory.close()
+        memory.unlink()
+    # The seams and endpoints use their own generator, seeded after the last tile
+    rng = random.Random(maze_seed(seed, len(tiles)))
+    stitch_tiles(maze, tile_size, trees, cuts + 1, rng)
+    return random_cell(maze, rng), random_cell(maze, rng), maze
+
+def parse_cli_args() :
+    import argparse
+    from sys import argv
+    parser = argparse.ArgumentParser(description='Generate\'s a single large maze in tiles, using every core')
+    parser.add_argument('-a', '--algorithm', default="kruskal", choices=list(GENERATORS), help='The generator to use for every tile')
+    parser.add_argument('-l', '--length', required=True, type=int, help='The length of the maze to be made')
+    parser.add_argument('-w', '--width',required=True,  type=int, help='The width of the maze to be made')
+    parser.add_argument('-tile', '--tile', type=int, default=256, help='The length and width of every tile')
+    parser.add_argument('-seed', '--seed', type=seed_arg, help='Seed the random number generator, the same seed always makes the same maze')
+    parser.add_argument('-cuts', '--cuts', type=int, help='The number of passages cut in every tile to join it to its neighbours in more places, a quarter of the tile size by default')
+    parser.add_argument('-workers', '--workers', type=int, help='The number of processes to use, all cores by default')
+    parser.add_argument('-export', '--export',required=True,  type=str, help=f'Export the created maze to a file as an adjacency list, or in the binary format if it ends with {BINARY_EXTENSION}')
+    if len(argv) == 1:
+        parser.print_help()
+        exit(0)
+    return parser.parse_args(argv[1:])
+
+def main():
+    '''Run if main module'''
+    args = parse_cli_args()
+    if args.length and args.width:
+        # Pick the seed here so the one that was used is saved with the maze
+        seed = args.seed if args.seed is not None else random.getrandbits(31)
+        STARTING_CELL, ENDING_CELL, maze = tiled_maze(args.length, args.width, args.tile, args.algorithm, seed, args.workers, args.cuts)
+        save_maze(maze, (STARTING_CELL, ENDING_CELL), args.export, seed=seed)
+
+if __name__ == '__main__':
+    main()
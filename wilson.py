@@ -0,0 +1,107 @@
+import random
+from array import array
+from Direction import DIRECTIONS, DX, DY, INVERSE
+from MazeGrid import WALL_BITS, GridCell, MazeGrid
+from carve_events import LOG_EXTENSION
+from maze import BINARY_EXTENSION, default_rng, generate_for_cli, random_cell, seed_arg
+
+def wilson(length:int, width:int, stats:dict[str,int]|None=None, animate:bool=True, record:bool=False, events:array|None=None, rng:random.Random|None=None):
+    """ based on Wilson's algorithm:\n
+    https://en.wikipedia.org/wiki/Maze_generation_algorithm
+        Returns a tuple containing the STARTING cell, ENDING cell, and a generator function for creating the maze based on those cells.
+        If `stats` is given, it is filled with the number of walk "steps" taken and the number of "carved" cells.
+    """
+    rng = default_rng(rng)
+    maze = MazeGrid(length, width)
+    STARTING_CELL = random_cell(maze, rng)
+    ENDING_CELL = random_cell(maze, rng)
+    # The cells are added to the tree all over the maze, so the traversal doesn't start with one
+    traversal: list[GridCell] | array = [] if animate else array('I')
+
+    def _generator():
+        cells = maze.cells
+        size = length * width
+        in_tree = bytearray(size)
+        # The index in DIRECTIONS of the last step taken out of every cell. Walking over a cell again overwrites it,
+        # which erases the loop without touching the rest of the walk
+        walk = array('b', [-1]) * size
+        steps = [DY[d] * width + DX[d] for d in DIRECTIONS]
+        bits = [WALL_BITS[d] for d in DIRECTIONS]
+        inverse_bits = [WALL_BITS[INVERSE[d]] for d in DIRECTIONS]
+        walked = carved = 0
+        # 1. Start the tree from a random cell
+        in_tree[rng.randrange(size)] = 1
+
+        if animate:
+            yield maze, traversal
+        for origin in range(size):
+            if in_tree[origin]:
+                continue
+            # 2. Walk randomly from a cell outside of the tree until the walk reaches the tree
+            node = origin
+            while not in_tree[node]:
+                x = node % width
+                while True:
+                    d = rng.getrandbits(2)
+                    # Directions are W, N, E, S; step again if the wall is on the border
+                    if (d == 0 and x > 0) or (d == 1 and node >= width) or (d == 2 and x < width - 1) or (d == 3 and node < size - width):
+                        break
+                walk[node] = d
+                node += steps[d]
+                walked += 1
+            # 3. Follow the loop-erased walk from its start again, carving it into the tree
+            node = origin
+            while not in_tree[node]:
+                d = walk[node]
+                in_tree[node] = 1
+                following = node + steps[d]
+                cells[node] |= bits[d]
+                cells[following] |= inverse_bits[d]
+                maze.version += 1
+                if events is not None:
+                    events.append((node << 2) | d)
+                carved += 1
+                if animate:
+                    traversal.append(GridCell(maze, node % width, node // width))
+                    node = following
+                    yield maze, traversal
+                else:
+                    if record:
+                        traversal.append(node)
+                    node = following
+            if stats is not None:
+                stats["steps"] = walked
+                stats["carved"] = carved
+        if not animate:
+            yield maze, traversal
+
+    return STARTING_CELL, ENDING_CELL, _generator(), maze, traversal
+
+def parse_cli_args() :
+    import argparse
+    from sys import argv
+    parser = argparse.ArgumentParser(description='Generate\'s a uniformly random maze using Wilson\'s algorithm')
+    parser.add_argument('-l', '--length', required=True, type=int, help='The length of the maze to be made')
+    parser.add_argument('-w', '--width',required=True,  type=int, help='The width of the maze to be made')
+    parser.add_argument('-seed', '--seed', type=seed_arg, help='Seed the random number generator, the same seed always makes the same maze')
+    parser.add_argument('-export', '--export', type=str, help=f'Export the created maze to a file as an adjacency list, or in the binary format if it ends with {BINARY_EXTENSION}')
+    parser.add_argument('-log', '--log', type=str, help=f'Also write every carved wall to a generation log ({LOG_EXTENSION}), see carve_events.py')
+    parser.add_argument('-stats', '--stats', action='store_true', help='Print the number of walk steps taken per carved cell')
+    if len(argv) == 1:
+        parser.print_help()
+        exit(0)
+    return parser.parse_args(argv[1:])
+
+def main():
+    '''Run if main module'''
+    args = parse_cli_args()
+    if args.length and args.width:
+        stats: dict[str,int] = {"steps": 0, "carved": 0}
+        generate_for_cli(lambda **options: wilson(length=args.length, width=args.width, stats=stats, **options), args)
+        if args.stats:
+            print("Walk steps:", stats["steps"])
+            print("Carved cells:", stats["carved"])
+            print("Steps per carved cell:", round(stats["steps"] / max(stats["carved"], 1), 2))
+
+if __name__ == '__main__':
+    main()